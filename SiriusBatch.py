@@ -0,0 +1,130 @@
+import os
+os.environ["MPLBACKEND"] = "Agg"  # pas d'écran : les figures sont sauvegardées en PNG
+
+import argparse
+import builtins
+import glob
+import json
+import multiprocessing
+import time
+import traceback
+import matplotlib.pyplot as plt
+import SiriusConverter
+import SiriusExport
+import SiriusModule
+import SiriusUtils
+
+# Mode batch : applique une liste d'analyses de SiriusModule à tous les logs d'un dossier,
+# un log par process. Les réponses aux input() des fonctions sont données dans le job.
+#
+# Exemple de job.json :
+# {
+#     "logs": "data/*.csv",
+#     "remove_last_col": true,
+#     "output": "batch_output",
+#     "workers": 4,
+#     "steps": [
+#         {"function": "adc_total"},
+#         {"function": "adc_trust", "y": "ADC_3", "inputs": ["", "1"]}
+#     ]
+# }
+
+
+def _init_worker():
+    # Les workers du Pool ne peuvent pas avoir d'enfants : l'executor calcule en séquentiel
+    SiriusUtils.get_executor(1)
+
+def _scripted_input(answers, step):
+    answers = iter(answers)
+
+    def scripted(prompt=""):
+        try:
+            answer = next(answers)
+        except StopIteration:
+            raise RuntimeError(f"{step}: no scripted answer for prompt {prompt!r}") from None
+        print(prompt + answer)
+        return answer
+    return scripted
+
+def run_log(path, steps, removeLastCol, output):
+    """Run every step on one log, saving figures and exports in output/<log name>/. Returns (path, errors)."""
+    outDir = os.path.abspath(os.path.join(output, os.path.splitext(os.path.basename(path))[0]))
+    os.makedirs(outDir, exist_ok=True)
+    errors = []
+
+    data = SiriusUtils.load_csv_cached(path, removeLastCol)
+    funcs = SiriusConverter.list_functions(SiriusModule)
+    x = data[list(data.keys())[0]]
+
+    cwd = os.getcwd()
+    os.chdir(outDir)  # les fonctions écrivent Thrust.csv, Chamber.csv... dans le dossier courant
+    try:
+        for i, step in enumerate(steps):
+            name = step["function"]
+            yName = step.get("y", list(data.keys())[1])
+            builtins.input = _scripted_input(step.get("inputs", []), name)
+            try:
+                funcs[name](x, data[yName], data)
+                for num in plt.get_fignums():
+                    plt.figure(num).savefig(f"{i:02d}_{name}_{yName}_{num}.png")
+            except Exception:
+                errors.append(f"{name}: {traceback.format_exc()}")
+            finally:
+                plt.close("all")
+        SiriusExport.wait()
+    finally:
+        os.chdir(cwd)
+    return path, errors
+
+def run_job(job):
+    """Process every log of the job in a process pool and print a summary."""
+    logs = job["logs"]
+    if isinstance(logs, str):
+        logs = sorted(glob.glob(os.path.join(logs, "*.csv")) if os.path.isdir(logs) else glob.glob(logs))
+    logs = [os.path.abspath(log) for log in logs]
+    steps = [s if isinstance(s, dict) else {"function": s} for s in job["steps"]]
+    output = job.get("output", "batch_output")
+    workers = min(job.get("workers") or os.cpu_count(), max(1, len(logs)))
+
+    print(f"BATCH : {len(logs)} LOGS, {len(steps)} STEPS, {workers} WORKERS")
+    start = time.perf_counter()
+    failed = 0
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        tasks = [(log, steps, job.get("remove_last_col", False), output) for log in logs]
+        for path, errors in pool.starmap(run_log, tasks):
+            status = "OK" if not errors else f"{len(errors)} ERROR(S)"
+            print(f"{os.path.basename(path)} : {status}")
+            for error in errors:
+                print("    " + error.replace("\n", "\n    "))
+            failed += bool(errors)
+
+    print(f"---------BATCH COMPLETED IN {time.perf_counter() - start:.1f} s, {failed} LOG(S) WITH ERRORS----------------")
+    return failed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run SiriusModule analyses on many logs without a display.")
+    parser.add_argument("job", nargs="?", help="JSON job file")
+    parser.add_argument("--logs", help="folder or glob of CSV logs (instead of a job file)")
+    parser.add_argument("--step", action="append", nargs="+", metavar=("FUNCTION", "Y"),
+                        help="FUNCTION [Y [ANSWER ...]], repeatable")
+    parser.add_argument("--remove-last-col", action="store_true")
+    parser.add_argument("--output", default="batch_output")
+    parser.add_argument("-j", "--workers", type=int)
+    args = parser.parse_args()
+
+    if args.job:
+        with open(args.job, "r") as f:
+            job = json.load(f)
+    elif args.logs and args.step:
+        job = {
+            "logs": args.logs,
+            "remove_last_col": args.remove_last_col,
+            "output": args.output,
+            "workers": args.workers,
+            "steps": [{"function": s[0], **({"y": s[1]} if len(s) > 1 else {}), "inputs": s[2:]} for s in args.step],
+        }
+    else:
+        parser.error("give a job file or --logs and at least one --step")
+
+    raise SystemExit(1 if run_job(job) else 0)
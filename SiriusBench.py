@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import numpy as np
+import SiriusUtils
+import SiriusExport
+import SiriusPlot
+import SiriusCalibration
+import SiriusProfile
+
+# Benchmark reproductible : génère un log synthétique (timestamp + ADC_0..ADC_15 avec une poussée
+# réaliste), chronomètre chaque étape et sauvegarde le résultat en JSON pour comparer entre commits.
+#
+#   python SiriusBench.py --rows 1000000 --save bench_results/base.json
+#   python SiriusBench.py --rows 1000000 --compare bench_results/base.json
+
+NB_CHANNELS = 16
+THERMISTOR_CHANNELS = range(0, 8)
+PT_CHANNELS = range(8, 12)
+THRUST_CHANNEL = 12
+STAGES = ["parse", "filter", "thermistor", "calibration", "spectrum", "export_csv", "export_npz", "plot_prep"]
+
+
+def _burn_profile(t, ignition, burnTime):
+    # Rampe de 0.3 s, plateau, puis décroissance exponentielle après l'extinction
+    rise = np.clip((t - ignition) / 0.3, 0, 1)
+    rise = rise * rise * (3 - 2 * rise)
+    tail = np.exp(-np.maximum(t - ignition - burnTime, 0) / 0.5)
+    return rise * tail
+
+def generate_rows(start, stop, rows, sampleRate=1000, seed=0):
+    """Synthetic samples start..stop of a rows-long test: (timestamps in us, (n, 16) ADC matrix)."""
+    rng = np.random.default_rng([seed, start])
+    i = np.arange(start, stop)
+    t = i / sampleRate
+    duration = rows / sampleRate
+    ignition = 0.4 * duration
+    burnTime = 0.2 * duration
+    burn = _burn_profile(t, ignition, burnTime)
+    heat = np.clip((t - ignition) / (burnTime + 5), 0, 1)
+
+    n = stop - start
+    adc = np.empty((n, NB_CHANNELS), dtype=np.float64)
+    for c in THERMISTOR_CHANNELS:
+        adc[:, c] = 409 + 1200 * heat * (0.5 + c / 16) + rng.normal(0, 2, n)
+    for c in PT_CHANNELS:
+        oscillation = 1 + 0.05 * np.sin(2 * np.pi * (180 + 20 * c) * t)
+        adc[:, c] = 808 + 1700 * burn * oscillation + rng.normal(0, 6, n)
+    adc[:, THRUST_CHANNEL] = 10 + 790 * burn * (1 + 0.03 * np.sin(2 * np.pi * 90 * t)) + rng.normal(0, 4, n)
+    for c in range(THRUST_CHANNEL + 1, NB_CHANNELS):
+        adc[:, c] = 300 + rng.normal(0, 10, n)
+
+    timestamps = (i * (1_000_000 // sampleRate)).astype(np.int64) + 1_000_000
+    return timestamps, np.clip(np.rint(adc), 0, 4095).astype(np.int64)
+
+def generate_csv(path, rows, sampleRate=1000, seed=0, trailingComma=True, chunkRows=500_000):
+    """Write a rows-long synthetic log in the ground station layout, chunk by chunk."""
+    end = ",\n" if trailingComma else "\n"
+    rowFormat = ",".join(["%d"] * (NB_CHANNELS + 1)) + end
+    with open(path, "w") as f:
+        f.write("timestamp," + ",".join(f"ADC_{c}" for c in range(NB_CHANNELS)) + end)
+        for start in range(0, rows, chunkRows):
+            stop = min(rows, start + chunkRows)
+            timestamps, adc = generate_rows(start, stop, rows, sampleRate, seed)
+            block = np.column_stack((timestamps, adc))
+            f.write((rowFormat * len(block)) % tuple(block.ravel().tolist()))
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(rows, workdir, stages=STAGES, seed=0):
+    """Generate a log in workdir and time every stage. Returns the result dict."""
+    csvPath = os.path.join(workdir, f"bench_{rows}.csv")
+    start = time.perf_counter()
+    generate_csv(csvPath, rows, seed=seed)
+    print(f"GENERATED {rows} ROWS ({os.path.getsize(csvPath) / 1e6:.1f} MB) IN {time.perf_counter() - start:.1f} s")
+
+    results = {}
+    state = {}
+
+    def timed(name, func):
+        t0 = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - t0
+        # ru_maxrss : pic du process depuis son lancement, pas celui de l'étape (il ne fait que monter)
+        peak = SiriusProfile.peak_rss_mb()
+        results[name] = {"seconds": seconds, "rows_per_s": rows / seconds if seconds else None, "process_peak_rss_mb": peak}
+        rss = f"   process peak RSS so far {peak:.0f} MB" if peak is not None else ""
+        print(f"{name:<12} {seconds:8.3f} s {results[name]['rows_per_s'] or 0:14,.0f} rows/s{rss}")
+
+    names = [f"ADC_{c}" for c in range(NB_CHANNELS)]
+
+    def parse():
+        state["data"] = SiriusUtils.load_csv(csvPath, remove_last_col=True)
+    def filter_():
+        state["filtered"] = [SiriusUtils.y_filtered(state["data"][name]) for name in names]
+    def thermistor():
+        state["temperature"] = [SiriusUtils.calcThermistance(state["filtered"][c]) for c in THERMISTOR_CHANNELS]
+    def calibration():
+        channels = [THRUST_CHANNEL, *PT_CHANNELS]
+        sensors = [SiriusCalibration.SENSORS["thrust"]] + [SiriusCalibration.SENSORS["pt_chamber"]] * len(PT_CHANNELS)
+        calibrated = SiriusCalibration.calibrate_matrix(np.vstack([state["filtered"][c] for c in channels]), sensors)
+        state["thrust"] = calibrated[0]
+        state["pt"] = list(calibrated[1:])
+    def spectrum():
+        fs = SiriusUtils.sample_rate(state["data"]["timestamp"])
+        SiriusUtils.spectrogram_matrix(np.vstack([state["data"][name] for name in names]), fs)
+    def export_csv():
+        x = state["data"]["timestamp"]
+        SiriusExport.export(os.path.join(workdir, "Thrust.csv"), {"time": (x - x[0]) / 1e6, "value": state["thrust"],
+                            "adc": state["filtered"][THRUST_CHANNEL]}, header="Time [s],N,ADC,\n", rowFormat="%.4f,%r,%r,\n")
+    def export_npz():
+        SiriusExport.export(os.path.join(workdir, "session.npz"), state["data"])
+    def plot_prep():
+        x = state["data"]["timestamp"]
+        for y in state["filtered"]:
+            SiriusPlot.DecimationPyramid(x, y).query(0, len(x), 2000)
+
+    # parse, filter et calibration sont requis par les étapes suivantes, même si on ne les chronomètre pas
+    for name, func in [("parse", parse), ("filter", filter_), ("thermistor", thermistor), ("calibration", calibration),
+                       ("spectrum", spectrum), ("export_csv", export_csv), ("export_npz", export_npz), ("plot_prep", plot_prep)]:
+        if name in stages:
+            timed(name, func)
+        elif name in ("parse", "filter", "calibration"):
+            func()
+
+    return {
+        "commit": _git_commit(),
+        "rows": rows,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "stages": results,
+    }
+
+def compare(result, baseline, tolerance=0.1):
+    """Print the speed ratio of every stage against baseline. Returns the stages slower by more than tolerance."""
+    print(f"\nCOMPARED TO {baseline.get('commit')} ({baseline['rows']} rows)")
+    regressions = []
+    for name, stage in result["stages"].items():
+        base = baseline["stages"].get(name)
+        if base is None or not base["rows_per_s"] or not stage["rows_per_s"]:
+            continue
+        ratio = stage["rows_per_s"] / base["rows_per_s"]
+        flag = ""
+        if ratio < 1 - tolerance:
+            flag = "  <-- REGRESSION"
+            regressions.append(name)
+        print(f"{name:<12} x{ratio:6.2f}{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the conversion stages on a synthetic log.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="10k to 100M")
+    parser.add_argument("--stages", nargs="*", default=STAGES, choices=STAGES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", help="keep the generated files here instead of a temporary folder")
+    parser.add_argument("--save", help="write the result JSON here")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="slowdown allowed before flagging a regression")
+    args = parser.parse_args()
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+        result = run(args.rows, args.workdir, args.stages, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as workdir:
+            result = run(args.rows, workdir, args.stages, args.seed)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"RESULT SAVED TO {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        raise SystemExit(1 if regressions else 0)
@@ -0,0 +1,157 @@
+import json
+import os
+import numpy as np
+import SiriusUtils
+import SiriusProfile
+
+# Registre des calibrations : chaque capteur est décrit par sa chaîne d'opérations, repliée une seule
+# fois en out = gain * adc + offset. Sur des ADC entiers (12 bits) on passe par une table de 4096 valeurs.
+#
+# Le lien canal -> capteur se met dans calibration.json (ou SIRIUS_CALIBRATION) :
+#     {"ADC_12": "thrust", "ADC_8": "pt_chamber"}
+
+
+class Calibration:
+    """Sensor model compiled from steps [(op, constant), ...] with op in add, sub, mul, div.
+
+    A nonlinear sensor gives function instead (applied to ADC values, e.g. the thermistor table).
+    """
+
+    def __init__(self, name, unit, steps=(), function=None):
+        self.name = name
+        self.unit = unit
+        self.steps = tuple(steps)
+        self.function = function
+        self.gain, self.offset = fold(self.steps)
+        self.cache_key = f"calibration:{name}"
+        self._table = None
+
+    def __repr__(self):
+        if self.function is not None:
+            return f"Calibration({self.name!r}, {self.unit!r}, function={self.function.__name__})"
+        return f"Calibration({self.name!r}, {self.unit!r}, gain={self.gain!r}, offset={self.offset!r})"
+
+    @property
+    def table(self):
+        """Calibrated value of every 12-bit ADC code."""
+        if self._table is None:
+            self._table = self.apply_float(np.arange(SiriusUtils.ADC_RESOLUTION, dtype=np.float64))
+        return self._table
+
+    def apply_float(self, y):
+        if self.function is not None:
+            return self.function(y)
+        out = np.multiply(y, self.gain, dtype=np.float64)
+        out += self.offset
+        return out
+
+    def __call__(self, y):
+        y = np.asarray(y)
+        if _is_adc_codes(y):
+            return self.table[y]
+        return self.apply_float(y)
+
+def fold(steps):
+    """Fold a chain of affine steps into a single (gain, offset)."""
+    gain, offset = 1.0, 0.0
+    for op, value in steps:
+        if op == "add":
+            offset += value
+        elif op == "sub":
+            offset -= value
+        elif op == "mul":
+            gain *= value
+            offset *= value
+        elif op == "div":
+            gain /= value
+            offset /= value
+        else:
+            raise ValueError(f"unknown calibration step {op!r}")
+    return gain, offset
+
+def _is_adc_codes(y):
+    return (np.issubdtype(y.dtype, np.integer) and y.size > 0
+            and y.min() >= 0 and y.max() < SiriusUtils.ADC_RESOLUTION)
+
+
+# Cellule de charge : ADC -> V (3.3 V / 4096) -> gain ampli 209 -> capacité / sensibilité 3 mV/V à 5 V
+_LOAD_CELL = [("mul", 3.3), ("div", 4096), ("div", 209)]
+
+SENSORS = {}
+
+def register(calibration):
+    SENSORS[calibration.name] = calibration
+    return calibration
+
+register(Calibration("thrust", "NEWTON", _LOAD_CELL + [("mul", 5000), ("div", 0.003 * 5), ("mul", 9.81 / 2.2)]))
+register(Calibration("thrust_offset", "NEWTON", [("sub", 10)] + _LOAD_CELL + [("mul", 5000), ("div", 0.003 * 5), ("mul", 9.81 / 2.2)]))
+register(Calibration("tank", "LBS", _LOAD_CELL + [("mul", 200), ("div", 0.003 * 5)]))
+register(Calibration("pt_chamber", "PSI", [("mul", 0.9438), ("add", 43)]))
+register(Calibration("pt_tank", "PSI", [("mul", 0.9202), ("add", -43)]))
+register(Calibration("chamber", "PSI", [("sub", 807.62), ("div", 1.019)]))
+register(Calibration("thermistor", "C", function=SiriusUtils.adc_to_temperature_array))
+
+
+CHANNEL_MAP_PATH = os.environ.get("SIRIUS_CALIBRATION", os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.json"))
+
+def load_channel_map(path=CHANNEL_MAP_PATH):
+    """{channel: Calibration} read from a JSON {channel: sensor name} file, empty if there is none."""
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r") as f:
+        return {channel: SENSORS[sensor] for channel, sensor in json.load(f).items()}
+
+CHANNELS = load_channel_map()
+
+
+@SiriusProfile.stage()
+def calibrate_matrix(matrix, sensors):
+    """Calibrate every row of a (n_channels, n_samples) matrix with its sensor, in one pass over the matrix."""
+    matrix = np.asarray(matrix)
+    if _is_adc_codes(matrix):
+        # Une seule indexation : tables (n_channels, 4096) lues à [canal, code]
+        tables = np.vstack([s.table for s in sensors])
+        return tables[np.arange(len(sensors))[:, None], matrix]
+
+    gains = np.array([1.0 if s.function else s.gain for s in sensors])[:, None]
+    offsets = np.array([0.0 if s.function else s.offset for s in sensors])[:, None]
+    out = np.multiply(matrix, gains, dtype=np.float64)
+    out += offsets
+    for i, sensor in enumerate(sensors):
+        if sensor.function is not None:
+            out[i] = sensor.function(matrix[i])
+    return out
+
+def calibrate_column(data, y, sensor, start=None, stop=None):
+    """Filtered and calibrated y[start:stop], cached when y is one of the loaded columns."""
+    name = SiriusUtils.column_name(data, y)
+    if name is None:
+        return sensor(SiriusUtils.y_filtered(y[start:stop]))
+    # Même clé que derive_channels(data, [name], y_filtered, sensor)
+    key = (name, start, stop, "y_filtered", sensor.cache_key)
+    result = SiriusUtils.DERIVATION_CACHE.get(key, data[name])
+    if result is None:
+        filtered = SiriusUtils.y_filtered_cached(data, name, start, stop)
+        result = SiriusUtils.DERIVATION_CACHE.put(key, data[name], sensor(filtered))
+    return result
+
+def calibrate_channels(data, channels=None):
+    """Filter and calibrate every channel of {name: Calibration} (default CHANNELS), computing only uncached ones."""
+    channels = CHANNELS if channels is None else channels
+    results = {}
+    missing = []
+    for name, sensor in channels.items():
+        cached = SiriusUtils.DERIVATION_CACHE.get((name, None, None, "y_filtered", sensor.cache_key), data[name])
+        if cached is None:
+            missing.append(name)
+        else:
+            results[name] = cached
+
+    if missing:
+        filtered = SiriusUtils.derive_channels(data, missing, SiriusUtils.y_filtered)
+        calibrated = calibrate_matrix(np.vstack(filtered), [channels[name] for name in missing])
+        for name, row in zip(missing, calibrated):
+            key = (name, None, None, "y_filtered", channels[name].cache_key)
+            results[name] = SiriusUtils.DERIVATION_CACHE.put(key, data[name], row)
+
+    return {name: results[name] for name in channels}
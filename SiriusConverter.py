@@ -1,33 +1,66 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import threading
-import time
 import importlib
+import argparse
 import inspect
+import os
+import hashlib
 import SiriusModule  # our module with functions
+import SiriusUtils
+import SiriusPlot
+import SiriusStream
+import SiriusProfile
+import SiriusCalibration
+
+plt = SiriusUtils.LazyModule("matplotlib.pyplot")
 
 def list_functions(module):
     """List all user-defined functions in a module."""
     funcs = {}
     for name, obj in inspect.getmembers(module, inspect.isfunction):
-        if obj.__module__ == module.__name__:  # skip imported ones
+        if obj.__module__ == module.__name__ and not name.startswith("_"):  # skip imported ones and helpers
             funcs[name] = obj
     return funcs
 
+_RELOAD_STATE = {}
+
+def _source_digest(path):
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
 def hot_reload(module_name="SiriusModule"):
-    """Reload a module and return its functions."""
+    """Reload a module if its source changed since the last call and return its functions."""
     module = importlib.import_module(module_name)
-    importlib.reload(module)
-    return list_functions(module)
+    stat = os.stat(module.__file__)
+    key = (stat.st_mtime_ns, stat.st_size)
+    state = _RELOAD_STATE.get(module_name)
+    if state is not None and state["key"] == key:
+        return state["funcs"]
+
+    digest = _source_digest(module.__file__)
+    if state is not None and state["digest"] == digest:
+        state["key"] = key  # fichier touché mais contenu identique
+        return state["funcs"]
+
+    if state is not None:
+        try:
+            module = importlib.reload(module)
+        except Exception as e:
+            # On garde les anciennes fonctions jusqu'à la prochaine modification du fichier
+            print("RELOAD FAILED:", e)
+            state["key"] = key
+            state["digest"] = digest
+            return state["funcs"]
+        print(f"{module_name} RELOADED")
+
+    funcs = list_functions(module)
+    _RELOAD_STATE[module_name] = {"key": key, "digest": digest, "funcs": funcs}
+    return funcs
 
 def adc14(x, y, formulaChoice):
     plt.figure()
     title = "ADC VALUE"
     YLabel = "ADC"
     YMax = 0
-    flag = 0
-    flag2 = 0
     if formulaChoice == "3":
         adc10_11(x,y)
         return
@@ -35,32 +68,28 @@ def adc14(x, y, formulaChoice):
     if formulaChoice == "4":
         adc_thermistance(x,y)
         return
+    start = x[0]
+    stop = x[-1]
+    burnTime = 0
     if formulaChoice == "1":
-        for i in range(len(y)):
-            if y[i] > YMax:
-                YMax = y[i]
-                #print(YMax)
-            y[i] = ((((((y[i]-10) *3.3)/4096)/209)*5000)/(0.003*5))*(9.81/2.2)
-        
-            if(flag == 0 and y[i] > 2900):
-                start = x[i]
-                flag2 = 1
-            if(flag2 == 1 and y[i] < 1500):
-                stop = x[i]
-                flag2 = 0
+        YMax = np.max(y)
+        y = SiriusCalibration.SENSORS["thrust_offset"](y)
+        burns = SiriusUtils.detect_burns(x, y, 2900, 1500)
+        if burns:
+            start = burns[0].ignition
+            stop = x[burns[0].stop - 1]
+            burnTime = burns[0].burn_time
 
         title = "THRUST"
         YLabel = "NEWTON"
     if formulaChoice == "2":
-        for i in range(len(y)):
-            if y[i] > YMax:
-                YMax = y[i]
-            y[i] = ((((((y[i]) *3.3)/4096)/209)*200)/(0.003*5))
+        YMax = np.max(y)
+        y = SiriusCalibration.SENSORS["tank"](y)
         title = "TANK"
         YLabel = "LBS"
 
     #y = np.convolve(y, signal.firwin(4,500, window = np.hanning(len(x)), pass_zero = 'lowpass', fs = 1200), mode = 'same')
-    print("burn time ish: " + f"{(stop - start)/1000000}")
+    print("burn time ish: " + f"{burnTime}")
     #plot.plot(x, np.real(y)) # np.real() uniquement pour éviter le "warning de casting complex values 
     plt.plot(x, y)
     plt.title(title + f"- MAX : {YMax}" +  f"- MAX Newton : {np.max(y)}")
@@ -69,59 +98,68 @@ def adc14(x, y, formulaChoice):
     plt.ylabel(YLabel)
     plt.show(block=False)
 
+def load_sessions(paths, remove_last_col, how="nearest", tolerance=None, rate=None):
+    """Load one log, or several boards merged on a common timeline (columns of the others prefixed by their file name)."""
+    if len(paths) == 1:
+        return SiriusUtils.load_csv_cached(paths[0], remove_last_col)
+    sessions = {}
+    for path in paths:
+        label = os.path.splitext(os.path.basename(path))[0]
+        sessions[label] = SiriusUtils.load_csv_cached(path, remove_last_col)
+    print(f"MERGING {len(paths)} LOGS ({how})...")
+    return SiriusUtils.merge_sessions(sessions, how, tolerance, rate)
+
 def main():
-    data = {}
-
-    with open(input("CSV path : "), "r") as din:
-        lines = din.readlines()
-        rem = input("REMOVE LAST COL? (y, n): ")
-        header = []
-        if rem == "y":
-            header = lines[0].split(',')[0:-1]
-        else:
-            header = lines[0].split(',')
-            header[-1] = header[-1][0:-1]
-            
-        for h in header:
-            data[h.strip()] = []
-        
-        print("CONVERTING DATA...")
-        
-        for i in range(1, len(lines)):
-            line = []
-            if rem == 'y':
-                line = lines[i].split(',')[0:-1]
-            else:
-                line = lines[i].split(',')
-            if len(line) != len(header):
-                print(f"ERROR : LINE {i} IGNORED")
-                continue
-
-            for l in range(len(header)):
-                try:
-                    data[header[l].strip()].append(int(line[l]))
-                except:
-                    data[header[l].strip()].append(line[l])
-        
-        print("---------DATA COMPLETED !!!----------------")
-        print("Headers available : ", "|".join(header),end="|")
-        return data
+    paths = [p.strip() for p in input("CSV path (several boards: a.csv;b.csv) : ").split(";") if p.strip()]
+    rem = input("REMOVE LAST COL? (y, n): ")
+    how, tolerance, rate = "nearest", None, None
+    if len(paths) > 1:
+        how = input("ALIGN : nearest, asof or linear (empty = nearest): ").strip() or "nearest"
+        tolerance = input("TOLERANCE in ms (empty = none): ").strip()
+        tolerance = float(tolerance) * SiriusUtils.TIMESTAMP_SCALE / 1000 if tolerance else None
+        rate = input("RESAMPLE RATE in Hz (empty = keep every timestamp): ").strip()
+        rate = float(rate) if rate else None
+    with SiriusProfile.command("load"):
+        data = load_sessions(paths, rem == "y", how, tolerance, rate)
+        SiriusUtils.time_index(data)
+
+    print("---------DATA COMPLETED !!!----------------")
+    print("Headers available : ", "|".join(data.keys()),end="|")
+    return data
         
             
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--follow", metavar="CSV", help="plot a CSV live while the ground station writes it")
+    parser.add_argument("--remove-last-col", action="store_true")
+    parser.add_argument("--channels", nargs="*", help="channels to plot in follow mode (default: all)")
+    parser.add_argument("--thermistance", action="store_true", help="convert followed channels to C")
+    parser.add_argument("--profile", choices=["on", "mem", "cprofile"], help="print a timing summary after every command")
+    args = parser.parse_args()
+    if args.follow:
+        SiriusStream.follow(args.follow, args.remove_last_col, args.channels, args.thermistance)
+        raise SystemExit
+    if args.profile:
+        SiriusProfile.configure(args.profile)
+
     data = main()
     while True:
         funcs = hot_reload("SiriusModule")
         print("\nAvailable functions:", list(funcs.keys()))
 
-        choice = input("Enter function name (or 'quit'): ").strip()
+        choice = input("Enter function name (or 'profile on|off|mem|cprofile', 'quit'): ").strip()
         if choice == "quit":
             break
+        if SiriusProfile.handle(choice):
+            continue
         if choice in funcs:
             try:
-                chooseY = input("Choose data Y : ")
-                funcs[choice](data[list(data.keys())[0]], data[chooseY], data)
+                with SiriusProfile.command(choice):
+                    chooseY = input("Choose data Y : ")
+                    funcs[choice](data[list(data.keys())[0]], data[chooseY], data)
             except Exception as e:
                 print("Error:", e)
+                # Sinon la figure à moitié tracée ressortirait vide au prochain plt.show()
+                SiriusPlot.pyplot.discard()
         else:
             print("Function not found.")
\ No newline at end of file
@@ -0,0 +1,109 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+import numpy as np
+import SiriusProfile
+
+# Exports en bloc, écrits par un thread dédié pour ne jamais bloquer le REPL.
+# Les tableaux passés à submit() ne doivent plus être modifiés par l'appelant.
+
+BLOCK_ROWS = 200_000
+
+_WRITER = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SiriusExport")
+_PENDING = set()
+
+
+def write_csv(path, columns, header, rowFormat=None, blockRows=BLOCK_ROWS):
+    """Write columns as CSV, formatting blockRows rows with a single % operation per block."""
+    columns = [np.asarray(c) for c in columns]
+    if rowFormat is None:
+        rowFormat = ",".join(["%r"] * len(columns)) + "\n"
+    n = len(columns[0])
+    with open(path, "w") as file:
+        file.write(header)
+        for start in range(0, n, blockRows):
+            stop = min(n, start + blockRows)
+            # Tableau objet : int et float restent des objets Python, donc %r donne le même texte qu'un f-string
+            block = np.empty((stop - start, len(columns)), dtype=object)
+            for c, col in enumerate(columns):
+                block[:, c] = col[start:stop]
+            file.write((rowFormat * (stop - start)) % tuple(block.ravel()))
+
+def write_json(path, columns):
+    """Write the columns as one JSON list of lists, one channel at a time (never the whole text in memory)."""
+    with open(path, "w") as f:
+        f.write("[")
+        for i, col in enumerate(columns.values()):
+            if i:
+                f.write(", ")
+            f.write(json.dumps(np.asarray(col).tolist()))
+        f.write("]")
+
+def write_npy(path, columns):
+    """Write the columns stacked as one (n_rows, n_columns) .npy array."""
+    np.save(path, np.column_stack(list(columns.values())))
+
+def write_npz(path, columns, compressed=False):
+    """Write one array per column in a .npz archive."""
+    (np.savez_compressed if compressed else np.savez)(path, **columns)
+
+def write_columns(path, columns, blockRows=BLOCK_ROWS):
+    """Write a columnar directory: manifest.json plus one .npy per column, filled block by block.
+
+    Same layout as the SiriusUtils session cache, readable back with read_columns.
+    """
+    os.makedirs(path, exist_ok=True)
+    manifest = {"columns": []}
+    for i, (name, col) in enumerate(columns.items()):
+        col = np.asarray(col)
+        filename = f"col_{i}.npy"
+        out = np.lib.format.open_memmap(os.path.join(path, filename), mode="w+", dtype=col.dtype, shape=col.shape)
+        for start in range(0, len(col), blockRows):
+            out[start:start + blockRows] = col[start:start + blockRows]
+        out.flush()
+        del out
+        manifest["columns"].append({"name": name, "file": filename, "dtype": col.dtype.str})
+    with open(os.path.join(path, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+def read_columns(path):
+    """Memory-map a directory written by write_columns back into a dict of columns."""
+    with open(os.path.join(path, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+    return {col["name"]: np.load(os.path.join(path, col["file"]), mmap_mode="r") for col in manifest["columns"]}
+
+@SiriusProfile.stage()
+def export(path, columns, header=None, rowFormat=None):
+    """Write columns ({name: array}) in the format given by the extension of path (.csv, .json, .npy, .npz, else a columnar directory)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        if header is None:
+            header = ",".join(columns.keys()) + "\n"
+        write_csv(path, list(columns.values()), header, rowFormat)
+    elif ext == ".json":
+        write_json(path, columns)
+    elif ext == ".npy":
+        write_npy(path, columns)
+    elif ext == ".npz":
+        write_npz(path, columns)
+    else:
+        write_columns(path, columns)
+    return path
+
+def _report(future):
+    if future.exception() is not None:
+        print("EXPORT FAILED :", future.exception())
+    else:
+        print(f"\nFILE COMPLETED : {future.result()}")
+
+def submit(path, columns, header=None, rowFormat=None):
+    """Export in the background writer thread, returns a Future resolved with path once written."""
+    future = _WRITER.submit(export, path, columns, header, rowFormat)
+    _PENDING.add(future)
+    future.add_done_callback(_PENDING.discard)
+    future.add_done_callback(_report)
+    return future
+
+def wait():
+    """Block until every submitted export is written."""
+    wait_futures(list(_PENDING))
@@ -1,27 +1,42 @@
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import threading
-import time
 import SiriusUtils
-import multiprocessing
-from scipy.signal import savgol_filter, butter, filtfilt
+import SiriusPlot
+import SiriusExport
+import SiriusCalibration
+
+plt = SiriusPlot.pyplot  # dessine dans le process d'affichage, le REPL n'attend pas la fermeture des figures
+signal = SiriusUtils.LazyModule("scipy.signal")
+
+def _position(text, data):
+    # "1234" = index, "12.5s" = secondes depuis le premier échantillon
+    text = text.strip()
+    if text.endswith("s"):
+        index = SiriusUtils.time_index(data)
+        return index.nearest(index.from_seconds(float(text[:-1])))
+    return int(text)
+
+def _ask_window(x, y, data, askStop=True):
+    startI = input("INDEX or TIME (e.g. 12.5s) for start (empty = auto burn detection): ")
+    if startI.strip() == "":
+        window = SiriusUtils.burn_window(x, y, data)
+        if window is None:
+            print("NO BURN FOUND, USING WHOLE RECORD")
+            return 0, len(y)
+        print(f"BURN DETECTED : INDEX {window[0]} TO {window[1]}")
+        return window
+    stopI = _position(input("INDEX or TIME for STOP: "), data) if askStop else None
+    return _position(startI, data), stopI
 
 def adc_denoise(x,y, *args):
-    y = savgol_filter(y, window_length=1000, polyorder=3)
-
-    maxY = 0
-    print(np.array(y).max())
-    for i in range(len(y)):
-        y[i] = float(y[i])
-        x[i] = float(x[i])
-        
-        if maxY < y[i]:
-            maxY = y[i]
-    
+    y = SiriusUtils.y_filtered_column(args[0], y)
+
+    maxY = y.max()
+    print(maxY)
+
     plt.figure()
     plt.title(f"FILTERED ADC VALUES MAX : {maxY:.2f}")
-    plt.plot(x, y)
+    SiriusPlot.plot(plt.gca(), x, y)
     plt.show()
 
 
@@ -29,110 +44,77 @@ def adc_avg(x,y, *args):
     window_size = 64
     y_moving_avg = np.convolve(y, np.ones(window_size)/window_size, mode='same')
     plt.figure()
-    plt.plot(x,y_moving_avg)
+    SiriusPlot.plot(plt.gca(), x,y_moving_avg)
     plt.title("Moving Average")
     plt.show()
 
 
+# Liste JSON d'un tableau par canal ; SIRIUS_THERMISTANCE_FILE=thermistance.npz pour un fichier binaire
+THERMISTANCE_FILE = os.environ.get("SIRIUS_THERMISTANCE_FILE", "thermistance.json")
+
 def adc_thermistance(x,y, *args):
-    valMax=0
-    y0 = SiriusUtils.y_filtered(args[0]["ADC_0"])
-    y1 = SiriusUtils.y_filtered(args[0]["ADC_1"])
-    y2 = SiriusUtils.y_filtered(args[0]["ADC_2"])
-    y3 = SiriusUtils.y_filtered(args[0]["ADC_3"])
-    y4 = SiriusUtils.y_filtered(args[0]["ADC_4"])
-    y5 = SiriusUtils.y_filtered(args[0]["ADC_5"])
-    y6 = SiriusUtils.y_filtered(args[0]["ADC_6"])
-    y7 = SiriusUtils.y_filtered(args[0]["ADC_7"])
-    list_of_y = [y0,y1,y2,y3,y4,y5,y6,y7]
-    with multiprocessing.Pool() as pool:
-        print("CALC IN PROGRESS...")
-        result = pool.map(SiriusUtils.calcThermistance, list_of_y)
-        percent = 0
-        for i in range(len(y)):
-            if valMax < y[i]:
-                valMax = y[i]
-
-            percent = i/len(y)*100
-            if(percent % 25 == 0):
-                print(f"\rPERCENT : {percent:.2f}", end="\r")
-    
-        print("saving data in a file!")
-        t = threading.Thread(target=SiriusUtils.data_to_file, args=("thermistance.json", result))
-        t.start()
-
-        plt.plot(x,result[0], label="ADC_0")
-        plt.plot(x,result[1], label="ADC_1")
-        plt.plot(x,result[2], label="ADC_2")
-        plt.plot(x,result[3], label="ADC_3")
-        plt.plot(x,result[4], label="ADC_4")
-        plt.plot(x,result[5], label="ADC_5")
-        plt.plot(x,result[6], label="ADC_6")
-        plt.plot(x,result[7], label="ADC_7")
-        valMax = SiriusUtils.adc_to_temperature(valMax)
-        plt.title(f"THERMISTANCE C MAX : {valMax:.2f}")
-        plt.legend()
-        plt.show(block = False)
-
-def adc(x,y:list, *args):
+    names = [f"ADC_{i}" for i in range(8)]
+    print("CALC IN PROGRESS...")
+    result = SiriusUtils.derive_channels(args[0], names, SiriusUtils.y_filtered, SiriusUtils.calcThermistance)
+    valMax = np.max(y)
+
+    print("saving data in a file!")
+    SiriusExport.submit(THERMISTANCE_FILE, {f"ADC_{i}": result[i] for i in range(len(result))})
+
     plt.figure()
-    maxY = 0
-    print(np.array(y).max())
-    for i in range(len(y)):
-        y[i] = float(y[i])
-        x[i] = float(x[i])
-        
-        if maxY < y[i]:
-            maxY = y[i]
+    for i in range(len(result)):
+        SiriusPlot.plot(plt.gca(), x,result[i], label=f"ADC_{i}")
+    valMax = SiriusUtils.adc_to_temperature(valMax)
+    plt.title(f"THERMISTANCE C MAX : {valMax:.2f}")
+    plt.legend()
+    plt.show(block = False)
+
+def adc(x,y, *args):
+    plt.figure()
+    maxY = y.max()
+    print(maxY)
     plt.title(f"ADC VALUES MAX : {maxY}")
-    plt.plot(x,y)
+    SiriusPlot.plot(plt.gca(), x,y)
     #plt.xlim(2.393e9, 2.403e9)
     plt.show()
 
 def adc_trust(x, y, *args):
     plt.figure()
-    startI = int(input("INDEX for start: "))
-    stopI = int(input("INDEX for STOP: "))
-    y = y[startI:stopI]
+    startI, stopI = _ask_window(x, y, args[0])
+    yadc = SiriusUtils.y_filtered_column(args[0], y, startI, stopI)
     x = x[startI:stopI]
     title = "ADC VALUE"
     YLabel = "ADC"
-    YMax = 0
-    flag = 0
-    flag2 = 0
     formulaChoice = input("1 - thrust 2- tank : ")
-    y = SiriusUtils.y_filtered(y)
-    yadc = np.copy(y)
-    start = 0
-    stop = 0
+    sensor = None
     if formulaChoice == "1":
-        y = ((((((y) *3.3)/4096)/209)*5000)/(0.003*5))*(9.81/2.2)
+        sensor = SiriusCalibration.SENSORS["thrust"]
         title = "THRUST"
         YLabel = "NEWTON"
-        #plt.xlim(start, stop)
     if formulaChoice == "2":
-        y = ((((((y) *3.3)/4096)/209)*200)/(0.003*5))
+        sensor = SiriusCalibration.SENSORS["tank"]
         title = "TANK"
         YLabel = "LBS"
+    y = yadc if sensor is None else SiriusCalibration.calibrate_column(args[0], y, sensor, startI, stopI)
 
     #y = np.convolve(y, signal.firwin(4,500, window = np.hanning(len(x)), pass_zero = 'lowpass', fs = 1200), mode = 'same')
     
     #plot.plot(x, np.real(y)) # np.real() uniquement pour éviter le "warning de casting complex values 
-    plt.plot(x, y)
+    SiriusPlot.plot(plt.gca(), x, y)
     plt.title(title + f"- MAX Newton : {np.max(y)}")
     plt.xlabel("TimeStamp (us)")
     plt.ylabel(YLabel)
     plt.show()
-    with open("Thrust.csv", "w") as file:
-        file.write(f"Time [s](starting at {x[0]} us),PSI,ADC,\n")
-        for i in range(len(x)):
-            file.write(f"{((x[i]-x[0])/1e6):.4f},{y[i]},{yadc[i]},\n")
+    SiriusExport.submit("Thrust.csv", {"time": (x - x[0]) / 1e6, "value": y, "adc": yadc},
+                        header=f"Time [s](starting at {x[0]} us),PSI,ADC,\n", rowFormat="%.4f,%r,%r,\n")
     #1.22 to 1.231
 
 def adc_total(x,y, *args):
     plt.figure()
+    names = [f"ADC_{i}" for i in range(16)]
+    filtered = SiriusUtils.derive_channels(args[0], names, SiriusUtils.y_filtered)
     for i in range(16):
-        plt.plot(x,SiriusUtils.y_filtered(args[0][f"ADC_{i}"]), label=f"ADC_{i}")
+        SiriusPlot.plot(plt.gca(), x,filtered[i], label=f"ADC_{i}")
     
     plt.title("ADC ALL")
     plt.legend()
@@ -140,73 +122,139 @@ def adc_total(x,y, *args):
 
 def adc_pt_chamber(x,y, *args):
     print("CHAMBER")
-    startI = int(input("INDEX for start: "))
-    y = y[startI:]
-    x = x[startI:]
-    yMax = 0
-    y = SiriusUtils.y_filtered(y)
-    yNp = np.array(y)
-
-    newY = (yNp-807.62)/1.019
+    startI, stopI = _ask_window(x, y, args[0], askStop=False)
+    yFiltered = SiriusUtils.y_filtered_column(args[0], y, startI, stopI)
+    newY = SiriusCalibration.calibrate_column(args[0], y, SiriusCalibration.SENSORS["chamber"], startI, stopI)
+    y = yFiltered
+    x = x[startI:stopI]
     yMax = newY.max()
     plt.figure()
     plt.title(f"PT CHAMBER MAX : {yMax:.2f}")
-    plt.plot(np.array(x),newY)
+    SiriusPlot.plot(plt.gca(), np.array(x),newY)
     plt.show()
 
-    with open("Chamber.csv", "w") as file:
-        file.write(f"Time [s](starting at {x[0]} us),PSI,ADC,\n")
-        for i in range(len(x)):
-            file.write(f"{((x[i]-x[0])/1e6):.4f},{newY[i]},{y[i]},\n")
+    SiriusExport.submit("Chamber.csv", {"time": (x - x[0]) / 1e6, "psi": newY, "adc": np.asarray(y)},
+                        header=f"Time [s](starting at {x[0]} us),PSI,ADC,\n", rowFormat="%.4f,%r,%r,\n")
 
 def find_index(x:list,y, *args):
     value = float(input("Enter the value X to find: "))
 
     # Find nearest value
-    nearest = min(x, key=lambda n: abs(n - value))
+    index = SiriusUtils.time_index(args[0]).nearest(value)
+    nearest = x[index]
 
     print(f"Nearest value to {value} is {nearest}")
-    print("Index of the nearest value : ", x.index(nearest))
+    print("Index of the nearest value : ", index)
 
 def export_csv(x,y,*args):
-    with open("Export.csv", "w") as file:
-        start = int(input("START X: "))
-        stop = int(input("STOP X: "))
-
-        file.write("timeStamp,Data,\n")
-        for i in range(start,len(y)):
-            if(i >= stop):
-                break
-            file.write(f"{x[i]},{y[i]},\n")
-    
-    print("EXPORT COMPLETED..")
+    start = _position(input("START X (index or time e.g. 12.5s): "), args[0])
+    stop = _position(input("STOP X: "), args[0])
+    path = input("FILE (.csv, .npy, .npz or folder, empty = Export.csv): ").strip() or "Export.csv"
+
+    SiriusExport.submit(path, {"timeStamp": x[start:stop], "Data": y[start:stop]},
+                        header="timeStamp,Data,\n", rowFormat="%r,%r,\n")
+    print("EXPORT STARTED..")
 
 def adc_pt(x,y, *args):
     print("PT in PSI")
-    startI = int(input("INDEX for start: "))
-    y = y[startI:]
-    x = x[startI:]
-    y = SiriusUtils.y_filtered(y)
-    start = 0
-    stop = 0
-    flag2 = 0
-    flag = 0
-    maxVal = 0
-    a = 0
-    b = 0
-    yNp = np.array(y)
+    startI, stopI = _ask_window(x, y, args[0], askStop=False)
+    x = x[startI:stopI]
     if input("CHOICE 1 : CHAMBER, 2: TANK :") == "1":
-        a = 0.9438
-        b = 43
+        sensor = SiriusCalibration.SENSORS["pt_chamber"]
     else:
-        a = 0.9202
-        b = -43
+        sensor = SiriusCalibration.SENSORS["pt_tank"]
 
-    newY = a*yNp+b
+    newY = SiriusCalibration.calibrate_column(args[0], y, sensor, startI, stopI)
 
-    print(start,stop)
-    plt.plot(x,newY)
+    plt.figure()
+    SiriusPlot.plot(plt.gca(), x,newY)
     plt.ylabel("PSI")
     #plt.xlim(7.445e7, 7.55e7)
     plt.title(f"PT- MAX : {newY.max():.2f}")
     plt.show()
+
+
+def adc_calibrated(x, y, *args):
+    channels = SiriusCalibration.CHANNELS
+    if not channels:
+        print(f"NO CHANNEL MAPPED, WRITE {SiriusCalibration.CHANNEL_MAP_PATH} (e.g. {{\"ADC_12\": \"thrust\"}})")
+        return
+    calibrated = SiriusCalibration.calibrate_channels(args[0], channels)
+    plt.figure()
+    for name, values in calibrated.items():
+        print(f"{name} ({channels[name].name}) MAX : {values.max():.2f} {channels[name].unit}")
+        SiriusPlot.plot(plt.gca(), x, values, label=f"{name} [{channels[name].unit}]")
+    plt.title("CALIBRATED CHANNELS")
+    plt.legend()
+    plt.show()
+
+def _physical(data, name):
+    # Filtré, et calibré si le canal est dans calibration.json
+    sensor = SiriusCalibration.CHANNELS.get(name)
+    if sensor is None:
+        return SiriusUtils.y_filtered_column(data, data[name]), "ADC"
+    return SiriusCalibration.calibrate_column(data, data[name], sensor), sensor.unit
+
+def adc_compare(x, y, *args):
+    name = SiriusUtils.column_name(args[0], y)
+    other = input("SECOND COLUMN (e.g. board2.ADC_8): ").strip()
+    yValues, yUnit = _physical(args[0], name)
+    otherValues, otherUnit = _physical(args[0], other)
+
+    plt.figure()
+    ax = plt.gca()
+    SiriusPlot.plot(ax, x, yValues, color="tab:blue")
+    ax.set_ylabel(f"{name} [{yUnit}]", color="tab:blue")
+    ax2 = ax.twinx()
+    SiriusPlot.plot(ax2, x, otherValues, color="tab:red")
+    ax2.set_ylabel(f"{other} [{otherUnit}]", color="tab:red")
+    plt.title(f"{name} VS {other}")
+    plt.show()
+
+def spectrum(x, y, *args):
+    data = args[0]
+    name = SiriusUtils.column_name(data, y)
+    startI, stopI = _ask_window(x, y, data)
+    names = input("CHANNELS (comma separated, empty = Y only, all = every ADC): ").strip()
+    if names == "all":
+        names = [n for n in data if n.split(".")[-1].startswith("ADC_")]
+    elif names:
+        names = [n.strip() for n in names.split(",")]
+    else:
+        names = [name]
+    if name not in names:
+        names.insert(0, name)
+    nperseg = int(input(f"SEGMENT LENGTH (empty = {SiriusUtils.SPECTRUM_NPERSEG}): ").strip() or SiriusUtils.SPECTRUM_NPERSEG)
+
+    print("CALC IN PROGRESS...")
+    freqs, times, psds = SiriusUtils.channel_spectrograms(data, names, startI, stopI, nperseg)
+    for channel, psd in zip(names, psds):
+        power = SiriusUtils.welch(psd)
+        peak = SiriusUtils.spectral_peak(freqs, power)
+        print(f"{channel} : PEAK {freqs[peak]:.1f} Hz ({10 * np.log10(power[peak]):.1f} dB)")
+
+    fig, (axWelch, axSpec) = plt.subplots(2, 1)
+    for channel, psd in zip(names, psds):
+        axWelch.semilogy(freqs, SiriusUtils.welch(psd), label=channel)
+    axWelch.set_xlabel("Hz")
+    axWelch.set_ylabel("PSD (ADC²/Hz)")
+    axWelch.legend()
+    mesh = axSpec.pcolormesh(times, freqs, 10 * np.log10(psds[0].T + 1e-12), shading="nearest")
+    fig.colorbar(mesh, ax=axSpec, label="dB")
+    axSpec.set_xlabel("TimeStamp (us)")
+    axSpec.set_ylabel("Hz")
+    axWelch.set_title(f"SPECTRUM - SPECTROGRAM OF {name}")
+    plt.show()
+
+def cache_stats(x, y, *args):
+    stats = SiriusUtils.DERIVATION_CACHE.stats()
+    print(f"DERIVATION CACHE : {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']*100:.1f}%)")
+    print(f"{stats['entries']} entries, {stats['bytes']/1e6:.1f} / {stats['max_bytes']/1e6:.1f} MB")
+
+def burns(x, y, *args):
+    names = [name for name in args[0] if name.startswith("ADC_")]
+    filtered = np.vstack(SiriusUtils.derive_channels(args[0], names, SiriusUtils.y_filtered))
+    on, off = SiriusUtils.burn_thresholds(filtered)
+    for name, channelBurns in zip(names, SiriusUtils.detect_burns(x, filtered, on, off, SiriusUtils.BURN_MIN_DURATION)):
+        for burn in channelBurns:
+            print(f"{name} : INDEX {burn.start} TO {burn.stop}, IGNITION {burn.ignition} us, BURN TIME {burn.burn_time:.3f} s")
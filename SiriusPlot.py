@@ -0,0 +1,407 @@
+import atexit
+import gc
+import importlib
+import os
+import queue
+import sys
+import traceback
+import weakref
+import numpy as np
+import SiriusProfile
+
+# Décimation min/max pour l'affichage : on ne donne jamais plus de quelques milliers de points
+# à matplotlib, mais chaque bucket garde son min et son max pour ne pas perdre les pics.
+
+BASE_BLOCK = 8
+DEFAULT_PIXELS = 2000
+
+
+def _block_extrema(y, block):
+    n = len(y)
+    nbBlocks = -(-n // block)
+    padded = np.full(nbBlocks * block, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(nbBlocks, block)
+    # Les NaN (thermistance hors table) ne doivent jamais gagner le min ou le max
+    offsets = np.arange(nbBlocks) * block
+    imin = np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1) + offsets
+    imax = np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1) + offsets
+    return np.minimum(imin, n - 1), np.minimum(imax, n - 1)
+
+def _merge_pairs(y, idx, better):
+    if len(idx) % 2:
+        idx = np.append(idx, idx[-1])
+    a = idx[0::2]
+    b = idx[1::2]
+    va = y[a]
+    return np.where(better(y[b], va) | np.isnan(va), b, a)
+
+class DecimationPyramid:
+    """Min/max indices per block at block sizes BASE_BLOCK * 2**k, to re-decimate any range quickly."""
+
+    def __init__(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.levels = []
+        if len(self.y) <= BASE_BLOCK:
+            return
+        imin, imax = _block_extrema(self.y, BASE_BLOCK)
+        block = BASE_BLOCK
+        self.levels.append((block, imin, imax))
+        while len(imin) > 1:
+            imin = _merge_pairs(self.y, imin, np.less)
+            imax = _merge_pairs(self.y, imax, np.greater)
+            block *= 2
+            self.levels.append((block, imin, imax))
+
+    def query(self, start, stop, pixels=DEFAULT_PIXELS):
+        """Return decimated (x, y) for the samples [start, stop) with about 2 to 4 points per pixel."""
+        start = max(0, start)
+        stop = min(len(self.y), stop)
+        if stop - start <= 4 * pixels or not self.levels:
+            return self.x[start:stop], self.y[start:stop]
+
+        # Plus gros niveau qui donne encore au moins `pixels` blocs sur la plage visible
+        block, imin, imax = self.levels[0]
+        for level in self.levels:
+            if (stop - start) // level[0] < pixels:
+                break
+            block, imin, imax = level
+        first = start // block
+        last = -(-stop // block)
+        idx = np.unique(np.concatenate((imin[first:last], imax[first:last])))
+        return self.x[idx], self.y[idx]
+
+    def index_range(self, xmin, xmax):
+        if len(self.x) > 1 and self.x[-1] >= self.x[0]:
+            return np.searchsorted(self.x, xmin, side="left") - 1, np.searchsorted(self.x, xmax, side="right") + 1
+        return 0, len(self.x)
+
+@SiriusProfile.stage()
+def plot(ax, x, y, *args, **kwargs):
+    """ax.plot replacement that draws a min/max decimated line and re-decimates it on zoom and pan.
+
+    ax can be an axes of the plot worker (from SiriusPlot.pyplot): the pyramid is built here and
+    shared with the worker through shared memory, which only draws it.
+    """
+    pyramid = DecimationPyramid(x, y)
+    if isinstance(ax, RemoteObject):
+        return ax._recorder.record("plot", ax, _share(ax._recorder, pyramid, y), args, kwargs)
+    return _draw(ax, pyramid, args, kwargs)
+
+def _draw(ax, pyramid, args, kwargs):
+    pixels = max(int(ax.bbox.width), DEFAULT_PIXELS // 4)
+    line, = ax.plot(*pyramid.query(0, len(pyramid.y), pixels), *args, **kwargs)
+
+    def on_xlim_changed(ax):
+        xmin, xmax = ax.get_xlim()
+        start, stop = pyramid.index_range(xmin, xmax)
+        line.set_data(*pyramid.query(start, stop, max(int(ax.bbox.width), 1)))
+
+    ax.callbacks.connect("xlim_changed", on_xlim_changed)
+    return line
+
+
+# Worker d'affichage : un process séparé (spawn) fait tourner la boucle d'événements de matplotlib.
+# SiriusModule utilise SiriusPlot.pyplot comme plt : les appels sont enregistrés puis envoyés au
+# worker à plt.show(), donc le REPL reprend la main tout de suite et les figures restent ouvertes.
+# Les courbes de SiriusPlot.plot passent par shared_memory (y dans son dtype d'origine et les niveaux
+# de décimation ; x une seule fois par envoi), le worker ne fait que les dessiner.
+# Avec un backend non interactif (MPLBACKEND=Agg, mode batch) ou SIRIUS_PLOT_WORKER=0, tout est local.
+
+NON_INTERACTIVE_BACKENDS = {"agg", "pdf", "ps", "svg", "cairo", "pgf", "template"}
+EVENT_LOOP_S = 0.05
+
+
+_SHARED = {}    # côté REPL : blocs envoyés, fermés quand le worker confirme les avoir ouverts
+_ATTACHED = {}  # côté worker : {nom: (bloc, weakrefs des figures)}, libéré quand elles sont toutes fermées
+
+def _share_arrays(arrays):
+    """Copy arrays into one new shared memory block, return (name, layout)."""
+    from multiprocessing import shared_memory
+    layout = []
+    size = 0
+    for a in arrays:
+        size = -(-size // 8) * 8
+        layout.append((size, a.dtype.str, a.shape))
+        size += a.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+    for (offset, dtype, shape), a in zip(layout, arrays):
+        np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)[...] = a
+    _SHARED[shm.name] = shm
+    return shm.name, layout
+
+def _share(recorder, pyramid, y):
+    """Share y (original dtype) and the pyramid levels, and x once per show() batch; return the plot spec."""
+    # Toutes les courbes d'une analyse ont en général le même x (la colonne timestamp)
+    key = id(pyramid.x)
+    if key not in recorder.shared_x:
+        recorder.shared_x[key] = (pyramid.x, _share_arrays([pyramid.x]))  # garde x : id stable
+    arrays = [np.asarray(y)] + [a for _, imin, imax in pyramid.levels for a in (imin, imax)]
+    return recorder.shared_x[key][1], _share_arrays(arrays), [block for block, _, _ in pyramid.levels]
+
+def _spec_names(spec):
+    return [spec[0][0], spec[1][0]]
+
+def _attach_arrays(name, layout, figure):
+    # Worker : un bloc déjà ouvert (x partagé) est réutilisé, la figure s'ajoute à ses utilisatrices
+    from multiprocessing import shared_memory
+    if name not in _ATTACHED:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Le segment reste valide tant qu'on le garde ouvert ; sous Windows unlink ne fait rien
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+        _ATTACHED[name] = (shm, [])
+    shm, figures = _ATTACHED[name]
+    figures.append(weakref.ref(figure))
+    return [np.ndarray(shape, dtype, buffer=shm.buf, offset=offset) for offset, dtype, shape in layout]
+
+def _attach(spec, figure):
+    """Pyramid whose arrays are views on the shared blocks of spec (worker side)."""
+    (xName, xLayout), (name, layout), blocks = spec
+    pyramid = DecimationPyramid.__new__(DecimationPyramid)
+    pyramid.x, = _attach_arrays(xName, xLayout, figure)
+    arrays = _attach_arrays(name, layout, figure)
+    pyramid.y = arrays[0]
+    pyramid.levels = [(block, arrays[1 + 2 * k], arrays[2 + 2 * k]) for k, block in enumerate(blocks)]
+    return pyramid
+
+def _figure_closed(ref, plt):
+    fig = ref()
+    return fig is None or not plt.fignum_exists(fig.number)
+
+def _release_closed_figures(plt):
+    closed = [name for name, (_, figures) in _ATTACHED.items()
+              if all(_figure_closed(ref, plt) for ref in figures)]
+    if not closed:
+        return
+    gc.collect()  # les callbacks de zoom gardent le pyramid dans des cycles
+    for name in closed:
+        try:
+            _ATTACHED[name][0].close()
+            del _ATTACHED[name]
+        except BufferError:
+            pass  # encore référencé, on réessaiera
+
+
+class _Ref:
+    def __init__(self, ref):
+        self.ref = ref
+
+class RemoteObject:
+    """Stand-in for a matplotlib object of the plot worker: method calls are recorded and return new stand-ins."""
+
+    def __init__(self, recorder, ref):
+        self._recorder = recorder
+        self._ref = ref
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            return self._recorder.record("call", self, name, args, kwargs)
+        return call
+
+class _Recorder:
+    def __init__(self):
+        self.next_ref = 1  # 0 = le module pyplot du worker
+        self.reset()
+
+    def reset(self):
+        self.ops = []
+        self.shared_x = {}  # {id(x): (x, (nom, layout))} des blocs x de l'envoi en cours
+
+    def _encode(self, value):
+        if isinstance(value, RemoteObject):
+            return _Ref(value._ref)
+        if isinstance(value, (list, tuple)):
+            return type(value)(self._encode(v) for v in value)
+        if isinstance(value, dict):
+            return {k: self._encode(v) for k, v in value.items()}
+        return value
+
+    def new(self):
+        ref = self.next_ref
+        self.next_ref += 1
+        return RemoteObject(self, ref)
+
+    def block_names(self):
+        """Names of the shared blocks of the recorded plot operations."""
+        return sorted({name for op in self.ops if op[0] == "plot" for name in _spec_names(op[3])})
+
+    def record(self, kind, target, name, args, kwargs):
+        result = self.new()
+        self.ops.append((kind, result._ref, target._ref, name, self._encode(args), self._encode(kwargs)))
+        return result
+
+    def subplots(self, args, kwargs):
+        fig = self.new()
+        nrows = args[0] if len(args) > 0 else kwargs.get("nrows", 1)
+        ncols = args[1] if len(args) > 1 else kwargs.get("ncols", 1)
+        axes = np.array([self.new() for _ in range(nrows * ncols)], dtype=object)
+        self.ops.append(("subplots", fig._ref, [a._ref for a in axes], None, args, kwargs))
+        # Même forme de retour que plt.subplots
+        axes = axes.reshape(nrows, ncols)
+        if kwargs.get("squeeze", True):
+            axes = axes.squeeze()
+            if axes.ndim == 0:
+                axes = axes.item()
+        return fig, axes
+
+def _decode(value, objects):
+    if isinstance(value, _Ref):
+        return objects[value.ref]
+    if isinstance(value, (list, tuple)):
+        return type(value)(_decode(v, objects) for v in value)
+    if isinstance(value, dict):
+        return {k: _decode(v, objects) for k, v in value.items()}
+    return value
+
+def _creates_figure(op):
+    kind, _, target, name = op[:4]
+    return kind == "subplots" or (kind == "call" and target == 0 and name in ("figure", "subplots"))
+
+def replay(ops, plt):
+    """Execute recorded operations on the real pyplot module plt, starting a new figure if ops don't."""
+    objects = {0: plt}
+    if ops and not _creates_figure(ops[0]):
+        # Sans ça, gca() dessinerait dans la figure d'une analyse précédente encore ouverte
+        plt.figure()
+    for kind, result, target, name, args, kwargs in ops:
+        args = _decode(args, objects)
+        kwargs = _decode(kwargs, objects)
+        if kind == "call":
+            objects[result] = getattr(objects[target], name)(*args, **kwargs)
+        elif kind == "plot":
+            ax = objects[target]
+            objects[result] = _draw(ax, _attach(name, ax.figure), args, kwargs)
+        elif kind == "subplots":
+            fig, axes = plt.subplots(*args, **{**kwargs, "squeeze": False})
+            objects[result] = fig
+            for ref, ax in zip(target, axes.ravel()):
+                objects[ref] = ax
+    return objects
+
+def _plot_worker(commands, attached):
+    import matplotlib.pyplot as plt
+    # Pas d'écran (matplotlib retombe sur Agg) : les figures seraient invisibles et jamais fermées
+    headless = plt.get_backend().lower() in NON_INTERACTIVE_BACKENDS
+    closing = False
+    while not (closing and not plt.get_fignums()):
+        _release_closed_figures(plt)
+        try:
+            ops = commands.get(timeout=EVENT_LOOP_S) if not plt.get_fignums() else commands.get_nowait()
+        except queue.Empty:
+            if plt.get_fignums():
+                plt.gcf().canvas.start_event_loop(EVENT_LOOP_S)
+            continue
+        if ops is None:
+            closing = True
+            continue
+        try:
+            replay(ops, plt)
+            # Le REPL peut fermer sa copie des blocs : ils sont ouverts ici
+            attached.put([n for op in ops if op[0] == "plot" for n in _spec_names(op[3])])
+            if headless:
+                print("NO DISPLAY, FIGURES NOT SHOWN", file=sys.stderr)
+                plt.close("all")
+            else:
+                plt.show(block=False)
+        except Exception:
+            print("PLOT FAILED:\n" + traceback.format_exc(), file=sys.stderr)
+    _release_closed_figures(plt)
+
+class RemotePyplot:
+    """Drop-in for matplotlib.pyplot that draws in the plot worker process instead of blocking the REPL."""
+
+    def __init__(self):
+        self._local = None
+        self._recorder = _Recorder()
+        self._process = None
+        self._commands = None
+        self._attached = None
+        self._atexit = False
+
+    def _use_local(self):
+        if self._local is None:
+            backend = os.environ.get("MPLBACKEND", "").lower()
+            self._local = (os.environ.get("SIRIUS_PLOT_WORKER", "1") == "0"
+                           or backend in NON_INTERACTIVE_BACKENDS or backend.startswith("module://"))
+        return self._local
+
+    def _start(self):
+        if self._process is None or not self._process.is_alive():
+            import multiprocessing
+            # spawn : pas de fork d'un process qui a déjà des threads (writer SiriusExport, scipy...)
+            context = multiprocessing.get_context("spawn")
+            if self._process is not None:
+                # Worker mort : les blocs qu'il n'a pas confirmés ne seront jamais ouverts
+                self._release_shared(everything=True)
+            self._commands = context.Queue()
+            self._attached = context.Queue()
+            self._process = context.Process(target=_plot_worker, args=(self._commands, self._attached), name="SiriusPlot")
+            self._process.start()
+            if not self._atexit:
+                # Enregistré après multiprocessing : passe avant la fonction qui attend la fin des process enfants
+                atexit.register(self.close)
+                self._atexit = True
+
+    def _release_shared(self, everything=False):
+        names = set()
+        while self._attached is not None:
+            try:
+                names.update(self._attached.get_nowait())
+            except queue.Empty:
+                break
+        for name in list(_SHARED):
+            if name in names or everything:
+                shm = _SHARED.pop(name)
+                shm.close()
+                if everything and name not in names:
+                    try:
+                        shm.unlink()
+                    except FileNotFoundError:
+                        pass
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._use_local():
+            return getattr(importlib.import_module("matplotlib.pyplot"), name)
+        if name == "show":
+            return self.show
+        if name == "subplots":
+            return lambda *args, **kwargs: self._recorder.subplots(args, kwargs)
+        return getattr(RemoteObject(self._recorder, 0), name)
+
+    def show(self, *args, **kwargs):
+        """Send the figures drawn since the last show to the worker, without waiting for them."""
+        if self._use_local():
+            return importlib.import_module("matplotlib.pyplot").show(*args, **kwargs)
+        self._release_shared()
+        if not self._recorder.ops:
+            return
+        self._start()
+        # Les courbes ne passent que par le nom de leur bloc partagé, la queue ne transporte que des petits objets
+        self._commands.put(self._recorder.ops)
+        self._recorder.reset()
+
+    def discard(self):
+        """Forget what was drawn since the last show, e.g. by an analysis that failed before plt.show()."""
+        for name in self._recorder.block_names():
+            # Jamais envoyés au worker : personne d'autre ne les ouvrira
+            shm = _SHARED.pop(name)
+            shm.close()
+            shm.unlink()
+        self._recorder.reset()
+
+    def close(self):
+        """Let the worker exit once its last figure is closed."""
+        if self._process is not None and self._process.is_alive():
+            print("CLOSE THE FIGURES TO EXIT")
+            self._commands.put(None)
+
+pyplot = RemotePyplot()
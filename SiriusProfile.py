@@ -0,0 +1,220 @@
+import builtins
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Instrumentation du REPL : temps mur, temps CPU, allocations et pic mémoire par étape.
+# Désactivé par défaut ; les fonctions décorées avec @stage() ne coûtent alors qu'un test de booléen.
+#
+# Dans le REPL : "profile on", "profile mem" (ajoute tracemalloc), "profile cprofile", "profile off",
+# "profile export fichier.json". Ou SIRIUS_PROFILE=on|mem|cprofile au lancement.
+
+ENABLED = False
+MEMORY = False
+CPROFILE = False
+
+_lock = threading.Lock()
+_local = threading.local()
+_records = []
+_history = []
+_profiler = None
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+def _begin(name):
+    stack = _stack()
+    depth = len(stack)
+    background = not stack and threading.current_thread() is not threading.main_thread()
+    if background:
+        # Export en arrière-plan : affiché comme une étape de la commande en cours
+        name += " (background)"
+        depth = 1
+    frame = {"name": name, "depth": depth, "wall": time.perf_counter(), "cpu": time.process_time(),
+             "background": background}
+    if MEMORY and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1].get("peak", 0), peak)
+        tracemalloc.reset_peak()
+        frame["mem"] = current
+        frame["peak"] = current
+    stack.append(frame)
+    return frame
+
+def _end(frame):
+    stack = _stack()
+    stack.pop()
+    record = {
+        "name": frame["name"],
+        "depth": frame["depth"],
+        "start": frame["wall"],
+        "wall": time.perf_counter() - frame["wall"],
+        "cpu": time.process_time() - frame["cpu"],
+        "background": frame["background"],
+    }
+    if "mem" in frame and tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(frame["peak"], peak)
+        record["alloc_mb"] = (current - frame["mem"]) / 1e6
+        record["peak_mb"] = (peak - frame["mem"]) / 1e6
+        if stack:
+            stack[-1]["peak"] = max(stack[-1].get("peak", 0), peak)
+    with _lock:
+        _records.append(record)
+    return record
+
+def stage(name=None):
+    """Decorator recording the wall/CPU time (and memory in mem mode) of each call when profiling is on."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            frame = _begin(label)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _end(frame)
+        return wrapper
+    return decorator
+
+def _timed_input(realInput):
+    def timed(prompt=""):
+        frame = _begin("input (user)")
+        try:
+            return realInput(prompt)
+        finally:
+            _end(frame)
+    return timed
+
+class command:
+    """Context manager around one REPL command: collects its stages and prints a summary at the end."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if not ENABLED:
+            return self
+        with _lock:
+            _records.clear()
+        self.realInput = builtins.input
+        builtins.input = _timed_input(self.realInput)
+        if CPROFILE:
+            global _profiler
+            _profiler = cProfile.Profile()
+            _profiler.enable()
+        self.frame = _begin(self.name)
+        return self
+
+    def __exit__(self, *exc):
+        if not ENABLED or not hasattr(self, "frame"):
+            return False
+        total = _end(self.frame)
+        builtins.input = self.realInput
+        if CPROFILE and _profiler is not None:
+            _profiler.disable()
+        with _lock:
+            records = sorted((r for r in _records if r is not total), key=lambda r: r["start"])
+        for record in records + [total]:
+            record["start"] -= self.frame["wall"]  # secondes depuis le début de la commande
+        entry = {"command": self.name, "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "peak_rss_mb": peak_rss_mb(),
+                 "total": total, "stages": records}
+        _history.append(entry)
+        print_summary(entry)
+        return False
+
+def peak_rss_mb():
+    """Peak RSS of the process since it started, in MB (None on Windows)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+def print_summary(entry):
+    """Print the stages of one command, grouped by name and nesting level."""
+    groups = {}
+    for record in entry["stages"]:
+        key = (record["depth"], record["name"])
+        group = groups.setdefault(key, {"calls": 0, "wall": 0.0, "cpu": 0.0, "peak_mb": None, "alloc_mb": None,
+                                        "background": record.get("background", False)})
+        group["calls"] += 1
+        group["wall"] += record["wall"]
+        group["cpu"] += record["cpu"]
+        if "peak_mb" in record:
+            group["peak_mb"] = max(group["peak_mb"] or 0.0, record["peak_mb"])
+            group["alloc_mb"] = (group["alloc_mb"] or 0.0) + record["alloc_mb"]
+
+    total = entry["total"]
+    # Les exports en arrière-plan tournent en parallèle de la commande : pas soustraits de son temps
+    tracked = sum(g["wall"] for (depth, _), g in groups.items() if depth == 1 and not g["background"])
+    print(f"\n---------PROFILE {entry['command']}----------------")
+    print(f"{'stage':<40}{'calls':>6}{'wall s':>10}{'cpu s':>10}{'alloc MB':>10}{'peak MB':>10}")
+    for (depth, name), g in groups.items():
+        alloc = f"{g['alloc_mb']:10.1f}" if g["alloc_mb"] is not None else " " * 10
+        peak = f"{g['peak_mb']:10.1f}" if g["peak_mb"] is not None else " " * 10
+        print(f"{'  ' * (depth - 1) + name:<40}{g['calls']:>6}{g['wall']:>10.3f}{g['cpu']:>10.3f}{alloc}{peak}")
+    print(f"{'untracked (plot, other)':<40}{'':>6}{total['wall'] - tracked:>10.3f}")
+    print(f"{'TOTAL':<40}{'':>6}{total['wall']:>10.3f}{total['cpu']:>10.3f}")
+    if entry["peak_rss_mb"] is not None:
+        print(f"PEAK RSS : {entry['peak_rss_mb']:.1f} MB")
+
+    if CPROFILE and _profiler is not None:
+        out = io.StringIO()
+        pstats.Stats(_profiler, stream=out).sort_stats("cumulative").print_stats(20)
+        print(out.getvalue())
+
+def configure(mode):
+    """Set the profiling mode: off, on, mem (adds tracemalloc) or cprofile."""
+    global ENABLED, MEMORY, CPROFILE
+    ENABLED = mode in ("on", "mem", "cprofile")
+    MEMORY = mode == "mem"
+    CPROFILE = mode == "cprofile"
+    if MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not MEMORY and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    print(f"PROFILING : {mode}")
+
+def export(path):
+    """Write every profiled command of the session as JSON (and the last cProfile run as .prof next to it)."""
+    with open(path, "w") as f:
+        json.dump(_history, f, indent=2)
+    if _profiler is not None:
+        _profiler.dump_stats(os.path.splitext(path)[0] + ".prof")
+    print(f"PROFILE EXPORTED TO {path}")
+
+def handle(choice):
+    """Handle a "profile ..." REPL command. Returns False if choice is not one."""
+    parts = choice.split()
+    if not parts or parts[0] != "profile":
+        return False
+    if len(parts) >= 3 and parts[1] == "export":
+        export(parts[2])
+    elif len(parts) == 2 and parts[1] in ("on", "off", "mem", "cprofile"):
+        configure(parts[1])
+    else:
+        print("usage: profile on|off|mem|cprofile  or  profile export FILE.json")
+    return True
+
+
+if os.environ.get("SIRIUS_PROFILE"):
+    configure(os.environ["SIRIUS_PROFILE"])
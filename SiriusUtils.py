@@ -1,14 +1,39 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy import signal
-import threading
-import time
+import importlib
 import json
 import os
-from scipy.signal import savgol_filter, butter, filtfilt
+import io
+import hashlib
+import shutil
+import atexit
+import weakref
+import functools
+import itertools
+from collections import OrderedDict
+from collections.abc import Mapping
 
 from typing import NamedTuple
 import math
+import SiriusProfile
+
+
+class LazyModule:
+    """Stand-in for a heavy module (matplotlib, scipy...) imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+# Importés au premier usage pour que le REPL démarre sans attendre scipy
+signal = LazyModule("scipy.signal")
+multiprocessing = LazyModule("multiprocessing")
+shared_memory = LazyModule("multiprocessing.shared_memory")
+fft = LazyModule("scipy.fft")
 
 # Equivalent of C++ struct RT_Point
 class RT_Point(NamedTuple):
@@ -18,159 +43,1041 @@ class RT_Point(NamedTuple):
 INVALID_VALUE = float("nan")  # Equivalent to PlotConfig::INVALID_VALUE
 
 
+RT_TABLE = [
+    RT_Point(-30, 1733200), RT_Point(-29, 1630408), RT_Point(-28, 1534477), RT_Point(-27, 1444903),
+    RT_Point(-26, 1361220), RT_Point(-25, 1283000), RT_Point(-24, 1209327), RT_Point(-23, 1140424),
+    RT_Point(-22, 1075949), RT_Point(-21, 1015588), RT_Point(-20, 959050), RT_Point(-19, 906011),
+    RT_Point(-18, 856288), RT_Point(-17, 809651), RT_Point(-16, 765886), RT_Point(-15, 724800),
+    RT_Point(-14, 685651), RT_Point(-13, 648893), RT_Point(-12, 614365), RT_Point(-11, 581917),
+    RT_Point(-10, 551410), RT_Point(-9, 522691), RT_Point(-8, 495667), RT_Point(-7, 470229),
+    RT_Point(-6, 446271), RT_Point(-5, 423700), RT_Point(-4, 402056), RT_Point(-3, 381666),
+    RT_Point(-2, 362449), RT_Point(-1, 344330), RT_Point(0, 327240), RT_Point(1, 311040),
+    RT_Point(2, 295751), RT_Point(3, 281316), RT_Point(4, 267682), RT_Point(5, 254800),
+    RT_Point(6, 242583), RT_Point(7, 231032), RT_Point(8, 220108), RT_Point(9, 209772),
+    RT_Point(10, 199990), RT_Point(11, 190558), RT_Point(12, 181632), RT_Point(13, 173182),
+    RT_Point(14, 165180), RT_Point(15, 157600), RT_Point(16, 150425), RT_Point(17, 143623),
+    RT_Point(18, 137173), RT_Point(19, 131053), RT_Point(20, 125245), RT_Point(21, 119658),
+    RT_Point(22, 114356), RT_Point(23, 109322), RT_Point(24, 104542), RT_Point(25, 100000),
+    RT_Point(26, 95819), RT_Point(27, 91839), RT_Point(28, 88049), RT_Point(29, 84440),
+    RT_Point(30, 81000), RT_Point(31, 77624), RT_Point(32, 74409), RT_Point(33, 71347),
+    RT_Point(34, 68430), RT_Point(35, 65650), RT_Point(36, 62984), RT_Point(37, 60442),
+    RT_Point(38, 58018), RT_Point(39, 55706), RT_Point(40, 53500), RT_Point(41, 51371),
+    RT_Point(42, 49339), RT_Point(43, 47399), RT_Point(44, 45548), RT_Point(45, 43780),
+    RT_Point(46, 42056), RT_Point(47, 40409), RT_Point(48, 38837), RT_Point(49, 37335),
+    RT_Point(50, 35899), RT_Point(51, 34616), RT_Point(52, 33386), RT_Point(53, 32206),
+    RT_Point(54, 31075), RT_Point(55, 29990), RT_Point(56, 28905), RT_Point(57, 27866),
+    RT_Point(58, 26870), RT_Point(59, 25915), RT_Point(60, 25000), RT_Point(61, 24110),
+    RT_Point(62, 23257), RT_Point(63, 22438), RT_Point(64, 21653), RT_Point(65, 20900),
+    RT_Point(66, 20174), RT_Point(67, 19477), RT_Point(68, 18808), RT_Point(69, 18167),
+    RT_Point(70, 17550), RT_Point(71, 16946), RT_Point(72, 16366), RT_Point(73, 15808),
+    RT_Point(74, 15274), RT_Point(75, 14760), RT_Point(76, 14281), RT_Point(77, 13820),
+    RT_Point(78, 13377), RT_Point(79, 12951), RT_Point(80, 12540), RT_Point(81, 12135),
+    RT_Point(82, 11745), RT_Point(83, 11369), RT_Point(84, 11008), RT_Point(85, 10660),
+    RT_Point(86, 10324), RT_Point(87, 10001), RT_Point(88, 9689), RT_Point(89, 9389),
+    RT_Point(90, 9100), RT_Point(91, 8817), RT_Point(92, 8544), RT_Point(93, 8282),
+    RT_Point(94, 8028), RT_Point(95, 7784), RT_Point(96, 7553), RT_Point(97, 7332),
+    RT_Point(98, 7117), RT_Point(99, 6910), RT_Point(100, 6710), RT_Point(101, 6526),
+    RT_Point(102, 6349), RT_Point(103, 6177), RT_Point(104, 6011), RT_Point(105, 5850),
+    RT_Point(106, 5683), RT_Point(107, 5522), RT_Point(108, 5366), RT_Point(109, 5215),
+    RT_Point(110, 5070), RT_Point(111, 4929), RT_Point(112, 4793), RT_Point(113, 4661),
+    RT_Point(114, 4533), RT_Point(115, 4410), RT_Point(116, 4290), RT_Point(117, 4175),
+    RT_Point(118, 4063), RT_Point(119, 3955), RT_Point(120, 3850), RT_Point(121, 3741),
+    RT_Point(122, 3635), RT_Point(123, 3534), RT_Point(124, 3435), RT_Point(125, 3340),
+    RT_Point(126, 3255), RT_Point(127, 3173), RT_Point(128, 3093), RT_Point(129, 3015),
+    RT_Point(130, 2940), RT_Point(131, 2863), RT_Point(132, 2789), RT_Point(133, 2717),
+    RT_Point(134, 2648), RT_Point(135, 2580), RT_Point(136, 2514), RT_Point(137, 2451),
+    RT_Point(138, 2389), RT_Point(139, 2329), RT_Point(140, 2270), RT_Point(141, 2213),
+    RT_Point(142, 2157), RT_Point(143, 2103), RT_Point(144, 2051), RT_Point(145, 2000),
+    RT_Point(146, 1951), RT_Point(147, 1904), RT_Point(148, 1858), RT_Point(149, 1813),
+    RT_Point(150, 1770), RT_Point(151, 1731), RT_Point(152, 1694), RT_Point(153, 1659),
+    RT_Point(154, 1623), RT_Point(155, 1589), RT_Point(156, 1552), RT_Point(157, 1516),
+    RT_Point(158, 1481), RT_Point(159, 1447), RT_Point(160, 1414), RT_Point(161, 1383),
+    RT_Point(162, 1349), RT_Point(163, 1318), RT_Point(164, 1288), RT_Point(165, 1259),
+    RT_Point(166, 1230), RT_Point(167, 1201), RT_Point(168, 1174), RT_Point(169, 1147),
+    RT_Point(170, 1122), RT_Point(171, 1096), RT_Point(172, 1070), RT_Point(173, 1044),
+    RT_Point(174, 1020), RT_Point(175, 997), RT_Point(176, 976), RT_Point(177, 955),
+    RT_Point(178, 935), RT_Point(179, 915), RT_Point(180, 896), RT_Point(181, 875),
+    RT_Point(182, 855), RT_Point(183, 835), RT_Point(184, 816), RT_Point(185, 797),
+    RT_Point(186, 781), RT_Point(187, 765), RT_Point(188, 749), RT_Point(189, 734),
+    RT_Point(190, 719), RT_Point(191, 703), RT_Point(192, 687), RT_Point(193, 672),
+    RT_Point(194, 657), RT_Point(195, 643), RT_Point(196, 630), RT_Point(197, 618),
+    RT_Point(198, 605), RT_Point(199, 593), RT_Point(200, 582), RT_Point(201, 571),
+    RT_Point(202, 561), RT_Point(203, 552), RT_Point(204, 542), RT_Point(205, 533),
+    RT_Point(206, 523), RT_Point(207, 512), RT_Point(208, 502), RT_Point(209, 492),
+    RT_Point(210, 483), RT_Point(211, 473), RT_Point(212, 464), RT_Point(213, 455),
+    RT_Point(214, 446), RT_Point(215, 437), RT_Point(216, 428), RT_Point(217, 420),
+    RT_Point(218, 412), RT_Point(219, 404), RT_Point(220, 396), RT_Point(221, 388),
+    RT_Point(222, 381), RT_Point(223, 374), RT_Point(224, 367), RT_Point(225, 360),
+    RT_Point(226, 353), RT_Point(227, 347), RT_Point(228, 340), RT_Point(229, 334),
+    RT_Point(230, 328), RT_Point(231, 322), RT_Point(232, 316), RT_Point(233, 310),
+    RT_Point(234, 305), RT_Point(235, 299), RT_Point(236, 294), RT_Point(237, 288),
+    RT_Point(238, 283), RT_Point(239, 278), RT_Point(240, 273), RT_Point(241, 269),
+    RT_Point(242, 264), RT_Point(243, 259), RT_Point(244, 255), RT_Point(245, 251),
+    RT_Point(246, 246), RT_Point(247, 242), RT_Point(248, 238), RT_Point(249, 234),
+    RT_Point(250, 230), RT_Point(251, 226), RT_Point(252, 222), RT_Point(253, 218),
+    RT_Point(254, 215), RT_Point(255, 211), RT_Point(256, 207), RT_Point(257, 204),
+    RT_Point(258, 201), RT_Point(259, 197), RT_Point(260, 194), RT_Point(261, 191),
+    RT_Point(262, 188), RT_Point(263, 185), RT_Point(264, 182), RT_Point(265, 179),
+    RT_Point(266, 176), RT_Point(267, 173), RT_Point(268, 171), RT_Point(269, 168),
+    RT_Point(270, 166), RT_Point(271, 163), RT_Point(272, 160), RT_Point(273, 158),
+    RT_Point(274, 155), RT_Point(275, 153), RT_Point(276, 151), RT_Point(277, 148),
+    RT_Point(278, 146), RT_Point(279, 143), RT_Point(280, 141), RT_Point(281, 139),
+    RT_Point(282, 137), RT_Point(283, 135), RT_Point(284, 133), RT_Point(285, 131),
+    RT_Point(286, 129), RT_Point(287, 127), RT_Point(288, 125), RT_Point(289, 123),
+    RT_Point(290, 122), RT_Point(291, 120), RT_Point(292, 118), RT_Point(293, 116),
+    RT_Point(294, 115), RT_Point(295, 113), RT_Point(296, 112), RT_Point(297, 110),
+    RT_Point(298, 108), RT_Point(299, 107), RT_Point(300, 106), RT_Point(301, 104),
+    RT_Point(302, 103), RT_Point(303, 101), RT_Point(304, 100), RT_Point(305, 98),
+    RT_Point(306, 97), RT_Point(307, 95), RT_Point(308, 94), RT_Point(309, 92),
+    RT_Point(310, 91), RT_Point(311, 90), RT_Point(312, 88), RT_Point(313, 87),
+    RT_Point(314, 86), RT_Point(315, 85), RT_Point(316, 83), RT_Point(317, 82),
+    RT_Point(318, 81), RT_Point(319, 80), RT_Point(320, 79), RT_Point(321, 77),
+    RT_Point(322, 76), RT_Point(323, 75), RT_Point(324, 74), RT_Point(325, 73),
+    RT_Point(326, 72), RT_Point(327, 71), RT_Point(328, 70), RT_Point(329, 69),
+    RT_Point(330, 68), RT_Point(331, 67), RT_Point(332, 66), RT_Point(333, 65),
+    RT_Point(334, 64), RT_Point(335, 63), RT_Point(336, 62), RT_Point(337, 61),
+    RT_Point(338, 60), RT_Point(339, 59), RT_Point(340, 58), RT_Point(341, 57),
+    RT_Point(342, 56), RT_Point(343, 56), RT_Point(344, 55), RT_Point(345, 54),
+    RT_Point(346, 53), RT_Point(347, 52), RT_Point(348, 51), RT_Point(349, 51),
+    RT_Point(350, 50), RT_Point(351, 49), RT_Point(352, 48), RT_Point(353, 48),
+    RT_Point(354, 47), RT_Point(355, 46), RT_Point(356, 45), RT_Point(357, 45),
+    RT_Point(358, 44), RT_Point(359, 43), RT_Point(360, 43), RT_Point(361, 42),
+    RT_Point(362, 41), RT_Point(363, 41), RT_Point(364, 40), RT_Point(365, 40),
+    RT_Point(366, 39), RT_Point(367, 38), RT_Point(368, 38), RT_Point(369, 37),
+    RT_Point(370, 37), RT_Point(371, 36), RT_Point(372, 36), RT_Point(373, 35),
+    RT_Point(374, 35), RT_Point(375, 34), RT_Point(376, 34), RT_Point(377, 33),
+    RT_Point(378, 33), RT_Point(379, 32), RT_Point(380, 32), RT_Point(381, 31),
+    RT_Point(382, 31), RT_Point(383, 30), RT_Point(384, 30), RT_Point(385, 29),
+    RT_Point(386, 29), RT_Point(387, 28), RT_Point(388, 28), RT_Point(389, 27),
+    RT_Point(390, 27), RT_Point(391, 26), RT_Point(392, 26), RT_Point(393, 26),
+    RT_Point(394, 25), RT_Point(395, 25), RT_Point(396, 24), RT_Point(397, 24),
+    RT_Point(398, 24), RT_Point(399, 23), RT_Point(400, 23),
+]
+
+RT_TABLE_SIZE = len(RT_TABLE)
+RT_TEMPERATURES = np.array([p.temperature for p in RT_TABLE], dtype=np.float64)
+RT_RESISTANCES = np.array([p.resistance for p in RT_TABLE], dtype=np.float64)
+
+MIN_VALID_ADC = 10
+MAX_VALID_ADC = 4090
+CONTROL_RESISTANCE = 10_000.0
+ADDITIVE_FACTOR = 4096.0
+ADC_RESOLUTION = 4096
+
+
+def _interpolate_temperature(adc_values):
+    # Même suite d'opérations que l'ancienne boucle pour un résultat identique au bit près
+    adc_values = np.asarray(adc_values, dtype=np.float64)
+    voltage = (adc_values / ADDITIVE_FACTOR) * 3.3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resistance = (3.3 / voltage) * CONTROL_RESISTANCE
+
+    # Premier segment i tel que R[i] >= r >= R[i+1] (table décroissante)
+    i = np.searchsorted(-RT_RESISTANCES, -resistance, side="left") - 1
+    i = np.clip(i, 0, RT_TABLE_SIZE - 2)
+    valid = (voltage > 0) & (resistance <= RT_RESISTANCES[0]) & (resistance >= RT_RESISTANCES[-1])
+
+    r0 = RT_RESISTANCES[i]
+    t0 = RT_TEMPERATURES[i]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (RT_TEMPERATURES[i + 1] - t0) / (RT_RESISTANCES[i + 1] - r0)
+        temp = t0 + slope * (resistance - r0)
+    return np.where(valid, temp, INVALID_VALUE)
+
+# Table ADC (12 bits) -> °C calculée une seule fois à l'import
+ADC_TEMPERATURE_LUT = _interpolate_temperature(np.arange(ADC_RESOLUTION))
+
+
+def adc_to_temperature_array(adc_values):
+    """Convert a whole channel of ADC values to °C (NaN when out of the RT table)."""
+    adc_values = np.asarray(adc_values)
+    if np.issubdtype(adc_values.dtype, np.integer) and adc_values.size:
+        if adc_values.min() >= 0 and adc_values.max() < ADC_RESOLUTION:
+            return ADC_TEMPERATURE_LUT[adc_values]
+    return _interpolate_temperature(adc_values)
+
 def adc_to_temperature(adc_value: float) -> float:
-    MIN_VALID_ADC = 10
-    MAX_VALID_ADC = 4090
-    CONTROL_RESISTANCE = 10_000.0
-    ADDITIVE_FACTOR = 4096.0
-
-    RT_TABLE = [
-        RT_Point(-30, 1733200), RT_Point(-29, 1630408), RT_Point(-28, 1534477), RT_Point(-27, 1444903),
-        RT_Point(-26, 1361220), RT_Point(-25, 1283000), RT_Point(-24, 1209327), RT_Point(-23, 1140424),
-        RT_Point(-22, 1075949), RT_Point(-21, 1015588), RT_Point(-20, 959050), RT_Point(-19, 906011),
-        RT_Point(-18, 856288), RT_Point(-17, 809651), RT_Point(-16, 765886), RT_Point(-15, 724800),
-        RT_Point(-14, 685651), RT_Point(-13, 648893), RT_Point(-12, 614365), RT_Point(-11, 581917),
-        RT_Point(-10, 551410), RT_Point(-9, 522691), RT_Point(-8, 495667), RT_Point(-7, 470229),
-        RT_Point(-6, 446271), RT_Point(-5, 423700), RT_Point(-4, 402056), RT_Point(-3, 381666),
-        RT_Point(-2, 362449), RT_Point(-1, 344330), RT_Point(0, 327240), RT_Point(1, 311040),
-        RT_Point(2, 295751), RT_Point(3, 281316), RT_Point(4, 267682), RT_Point(5, 254800),
-        RT_Point(6, 242583), RT_Point(7, 231032), RT_Point(8, 220108), RT_Point(9, 209772),
-        RT_Point(10, 199990), RT_Point(11, 190558), RT_Point(12, 181632), RT_Point(13, 173182),
-        RT_Point(14, 165180), RT_Point(15, 157600), RT_Point(16, 150425), RT_Point(17, 143623),
-        RT_Point(18, 137173), RT_Point(19, 131053), RT_Point(20, 125245), RT_Point(21, 119658),
-        RT_Point(22, 114356), RT_Point(23, 109322), RT_Point(24, 104542), RT_Point(25, 100000),
-        RT_Point(26, 95819), RT_Point(27, 91839), RT_Point(28, 88049), RT_Point(29, 84440),
-        RT_Point(30, 81000), RT_Point(31, 77624), RT_Point(32, 74409), RT_Point(33, 71347),
-        RT_Point(34, 68430), RT_Point(35, 65650), RT_Point(36, 62984), RT_Point(37, 60442),
-        RT_Point(38, 58018), RT_Point(39, 55706), RT_Point(40, 53500), RT_Point(41, 51371),
-        RT_Point(42, 49339), RT_Point(43, 47399), RT_Point(44, 45548), RT_Point(45, 43780),
-        RT_Point(46, 42056), RT_Point(47, 40409), RT_Point(48, 38837), RT_Point(49, 37335),
-        RT_Point(50, 35899), RT_Point(51, 34616), RT_Point(52, 33386), RT_Point(53, 32206),
-        RT_Point(54, 31075), RT_Point(55, 29990), RT_Point(56, 28905), RT_Point(57, 27866),
-        RT_Point(58, 26870), RT_Point(59, 25915), RT_Point(60, 25000), RT_Point(61, 24110),
-        RT_Point(62, 23257), RT_Point(63, 22438), RT_Point(64, 21653), RT_Point(65, 20900),
-        RT_Point(66, 20174), RT_Point(67, 19477), RT_Point(68, 18808), RT_Point(69, 18167),
-        RT_Point(70, 17550), RT_Point(71, 16946), RT_Point(72, 16366), RT_Point(73, 15808),
-        RT_Point(74, 15274), RT_Point(75, 14760), RT_Point(76, 14281), RT_Point(77, 13820),
-        RT_Point(78, 13377), RT_Point(79, 12951), RT_Point(80, 12540), RT_Point(81, 12135),
-        RT_Point(82, 11745), RT_Point(83, 11369), RT_Point(84, 11008), RT_Point(85, 10660),
-        RT_Point(86, 10324), RT_Point(87, 10001), RT_Point(88, 9689), RT_Point(89, 9389),
-        RT_Point(90, 9100), RT_Point(91, 8817), RT_Point(92, 8544), RT_Point(93, 8282),
-        RT_Point(94, 8028), RT_Point(95, 7784), RT_Point(96, 7553), RT_Point(97, 7332),
-        RT_Point(98, 7117), RT_Point(99, 6910), RT_Point(100, 6710), RT_Point(101, 6526),
-        RT_Point(102, 6349), RT_Point(103, 6177), RT_Point(104, 6011), RT_Point(105, 5850),
-        RT_Point(106, 5683), RT_Point(107, 5522), RT_Point(108, 5366), RT_Point(109, 5215),
-        RT_Point(110, 5070), RT_Point(111, 4929), RT_Point(112, 4793), RT_Point(113, 4661),
-        RT_Point(114, 4533), RT_Point(115, 4410), RT_Point(116, 4290), RT_Point(117, 4175),
-        RT_Point(118, 4063), RT_Point(119, 3955), RT_Point(120, 3850), RT_Point(121, 3741),
-        RT_Point(122, 3635), RT_Point(123, 3534), RT_Point(124, 3435), RT_Point(125, 3340),
-        RT_Point(126, 3255), RT_Point(127, 3173), RT_Point(128, 3093), RT_Point(129, 3015),
-        RT_Point(130, 2940), RT_Point(131, 2863), RT_Point(132, 2789), RT_Point(133, 2717),
-        RT_Point(134, 2648), RT_Point(135, 2580), RT_Point(136, 2514), RT_Point(137, 2451),
-        RT_Point(138, 2389), RT_Point(139, 2329), RT_Point(140, 2270), RT_Point(141, 2213),
-        RT_Point(142, 2157), RT_Point(143, 2103), RT_Point(144, 2051), RT_Point(145, 2000),
-        RT_Point(146, 1951), RT_Point(147, 1904), RT_Point(148, 1858), RT_Point(149, 1813),
-        RT_Point(150, 1770), RT_Point(151, 1731), RT_Point(152, 1694), RT_Point(153, 1659),
-        RT_Point(154, 1623), RT_Point(155, 1589), RT_Point(156, 1552), RT_Point(157, 1516),
-        RT_Point(158, 1481), RT_Point(159, 1447), RT_Point(160, 1414), RT_Point(161, 1383),
-        RT_Point(162, 1349), RT_Point(163, 1318), RT_Point(164, 1288), RT_Point(165, 1259),
-        RT_Point(166, 1230), RT_Point(167, 1201), RT_Point(168, 1174), RT_Point(169, 1147),
-        RT_Point(170, 1122), RT_Point(171, 1096), RT_Point(172, 1070), RT_Point(173, 1044),
-        RT_Point(174, 1020), RT_Point(175, 997), RT_Point(176, 976), RT_Point(177, 955),
-        RT_Point(178, 935), RT_Point(179, 915), RT_Point(180, 896), RT_Point(181, 875),
-        RT_Point(182, 855), RT_Point(183, 835), RT_Point(184, 816), RT_Point(185, 797),
-        RT_Point(186, 781), RT_Point(187, 765), RT_Point(188, 749), RT_Point(189, 734),
-        RT_Point(190, 719), RT_Point(191, 703), RT_Point(192, 687), RT_Point(193, 672),
-        RT_Point(194, 657), RT_Point(195, 643), RT_Point(196, 630), RT_Point(197, 618),
-        RT_Point(198, 605), RT_Point(199, 593), RT_Point(200, 582), RT_Point(201, 571),
-        RT_Point(202, 561), RT_Point(203, 552), RT_Point(204, 542), RT_Point(205, 533),
-        RT_Point(206, 523), RT_Point(207, 512), RT_Point(208, 502), RT_Point(209, 492),
-        RT_Point(210, 483), RT_Point(211, 473), RT_Point(212, 464), RT_Point(213, 455),
-        RT_Point(214, 446), RT_Point(215, 437), RT_Point(216, 428), RT_Point(217, 420),
-        RT_Point(218, 412), RT_Point(219, 404), RT_Point(220, 396), RT_Point(221, 388),
-        RT_Point(222, 381), RT_Point(223, 374), RT_Point(224, 367), RT_Point(225, 360),
-        RT_Point(226, 353), RT_Point(227, 347), RT_Point(228, 340), RT_Point(229, 334),
-        RT_Point(230, 328), RT_Point(231, 322), RT_Point(232, 316), RT_Point(233, 310),
-        RT_Point(234, 305), RT_Point(235, 299), RT_Point(236, 294), RT_Point(237, 288),
-        RT_Point(238, 283), RT_Point(239, 278), RT_Point(240, 273), RT_Point(241, 269),
-        RT_Point(242, 264), RT_Point(243, 259), RT_Point(244, 255), RT_Point(245, 251),
-        RT_Point(246, 246), RT_Point(247, 242), RT_Point(248, 238), RT_Point(249, 234),
-        RT_Point(250, 230), RT_Point(251, 226), RT_Point(252, 222), RT_Point(253, 218),
-        RT_Point(254, 215), RT_Point(255, 211), RT_Point(256, 207), RT_Point(257, 204),
-        RT_Point(258, 201), RT_Point(259, 197), RT_Point(260, 194), RT_Point(261, 191),
-        RT_Point(262, 188), RT_Point(263, 185), RT_Point(264, 182), RT_Point(265, 179),
-        RT_Point(266, 176), RT_Point(267, 173), RT_Point(268, 171), RT_Point(269, 168),
-        RT_Point(270, 166), RT_Point(271, 163), RT_Point(272, 160), RT_Point(273, 158),
-        RT_Point(274, 155), RT_Point(275, 153), RT_Point(276, 151), RT_Point(277, 148),
-        RT_Point(278, 146), RT_Point(279, 143), RT_Point(280, 141), RT_Point(281, 139),
-        RT_Point(282, 137), RT_Point(283, 135), RT_Point(284, 133), RT_Point(285, 131),
-        RT_Point(286, 129), RT_Point(287, 127), RT_Point(288, 125), RT_Point(289, 123),
-        RT_Point(290, 122), RT_Point(291, 120), RT_Point(292, 118), RT_Point(293, 116),
-        RT_Point(294, 115), RT_Point(295, 113), RT_Point(296, 112), RT_Point(297, 110),
-        RT_Point(298, 108), RT_Point(299, 107), RT_Point(300, 106), RT_Point(301, 104),
-        RT_Point(302, 103), RT_Point(303, 101), RT_Point(304, 100), RT_Point(305, 98),
-        RT_Point(306, 97), RT_Point(307, 95), RT_Point(308, 94), RT_Point(309, 92),
-        RT_Point(310, 91), RT_Point(311, 90), RT_Point(312, 88), RT_Point(313, 87),
-        RT_Point(314, 86), RT_Point(315, 85), RT_Point(316, 83), RT_Point(317, 82),
-        RT_Point(318, 81), RT_Point(319, 80), RT_Point(320, 79), RT_Point(321, 77),
-        RT_Point(322, 76), RT_Point(323, 75), RT_Point(324, 74), RT_Point(325, 73),
-        RT_Point(326, 72), RT_Point(327, 71), RT_Point(328, 70), RT_Point(329, 69),
-        RT_Point(330, 68), RT_Point(331, 67), RT_Point(332, 66), RT_Point(333, 65),
-        RT_Point(334, 64), RT_Point(335, 63), RT_Point(336, 62), RT_Point(337, 61),
-        RT_Point(338, 60), RT_Point(339, 59), RT_Point(340, 58), RT_Point(341, 57),
-        RT_Point(342, 56), RT_Point(343, 56), RT_Point(344, 55), RT_Point(345, 54),
-        RT_Point(346, 53), RT_Point(347, 52), RT_Point(348, 51), RT_Point(349, 51),
-        RT_Point(350, 50), RT_Point(351, 49), RT_Point(352, 48), RT_Point(353, 48),
-        RT_Point(354, 47), RT_Point(355, 46), RT_Point(356, 45), RT_Point(357, 45),
-        RT_Point(358, 44), RT_Point(359, 43), RT_Point(360, 43), RT_Point(361, 42),
-        RT_Point(362, 41), RT_Point(363, 41), RT_Point(364, 40), RT_Point(365, 40),
-        RT_Point(366, 39), RT_Point(367, 38), RT_Point(368, 38), RT_Point(369, 37),
-        RT_Point(370, 37), RT_Point(371, 36), RT_Point(372, 36), RT_Point(373, 35),
-        RT_Point(374, 35), RT_Point(375, 34), RT_Point(376, 34), RT_Point(377, 33),
-        RT_Point(378, 33), RT_Point(379, 32), RT_Point(380, 32), RT_Point(381, 31),
-        RT_Point(382, 31), RT_Point(383, 30), RT_Point(384, 30), RT_Point(385, 29),
-        RT_Point(386, 29), RT_Point(387, 28), RT_Point(388, 28), RT_Point(389, 27),
-        RT_Point(390, 27), RT_Point(391, 26), RT_Point(392, 26), RT_Point(393, 26),
-        RT_Point(394, 25), RT_Point(395, 25), RT_Point(396, 24), RT_Point(397, 24),
-        RT_Point(398, 24), RT_Point(399, 23), RT_Point(400, 23),
-    ]
-
-    RT_TABLE_SIZE = len(RT_TABLE)
-
-    # Calculate voltage
-    voltage = (adc_value / ADDITIVE_FACTOR) * 3.3
-    if voltage <= 0:
-        return INVALID_VALUE
-
-    # Calculate resistance
-    resistance = (3.3 / voltage) * CONTROL_RESISTANCE
-
-    # Search in table
-    for i in range(RT_TABLE_SIZE - 1):
-        if resistance <= RT_TABLE[i].resistance and resistance >= RT_TABLE[i + 1].resistance:
-            slope = ((RT_TABLE[i + 1].temperature - RT_TABLE[i].temperature) /
-                     (RT_TABLE[i + 1].resistance - RT_TABLE[i].resistance))
-            temp = RT_TABLE[i].temperature + slope * (resistance - RT_TABLE[i].resistance)
-            return temp
-
-    return INVALID_VALUE
+    return float(adc_to_temperature_array(adc_value))
 
+@SiriusProfile.stage()
 def calcThermistance(rawData):
-    data = []
-    percent = 0
     print("START CALC ")
-    for i in range(len(rawData)):
-        data.append(adc_to_temperature(rawData[i]))
-    
-    return data
+    return adc_to_temperature_array(rawData)
 
-def y_filtered(rawData):
-    y_denoise = savgol_filter(rawData, window_length=1000, polyorder=3)
+@SiriusProfile.stage()
+def y_filtered(rawData, window_length=1000, polyorder=3):
+    rawData = np.asarray(rawData)
+    gaps = None
+    if rawData.dtype.kind == "f":
+        gaps = np.isnan(rawData)
+        if gaps.all():
+            return rawData.copy()
+        if gaps.any():
+            # Trous d'un log fusionné (merge_sessions) : interpolés pour le filtre, puis remis à NaN
+            valid = np.flatnonzero(~gaps)
+            rawData = np.interp(np.arange(len(rawData)), valid, rawData[valid])
+        else:
+            gaps = None
+    y_denoise = signal.savgol_filter(rawData, window_length=window_length, polyorder=polyorder)
+    if gaps is not None:
+        y_denoise[gaps] = np.nan
     return y_denoise
 
-def data_to_file(filename, data):
+FALLBACK_LINES = 65536  # lignes par bloc quand le fichier n'est pas entièrement entier
+
+def _loadtxt(lines, usecols, dtype):
+    return np.loadtxt(lines, delimiter=",", usecols=usecols, dtype=dtype, ndmin=2, comments=None)
+
+def _numeric_line(line, usecols):
+    cells = line.split(b",")
+    try:
+        for c in usecols:
+            float(cells[c])
+    except (ValueError, IndexError):
+        return False
+    return True
+
+def _parse_block(lines, usecols):
+    # int64, sinon float64 ; sinon les lignes avec une cellule vide ou illisible sont écartées
+    for dtype in (np.int64, np.float64):
+        try:
+            return _loadtxt(lines, usecols, dtype), []
+        except ValueError:
+            continue
+    bad = [i for i, line in enumerate(lines) if not _numeric_line(line, usecols)]
+    if not bad:
+        raise ValueError(f"cannot parse rows {lines[0]!r}...")
+    badSet = set(bad)
+    good = [line for i, line in enumerate(lines) if i not in badSet]
+    if not good:
+        return np.empty((0, len(usecols))), bad
+    return _loadtxt(good, usecols, np.float64), bad
+
+def _merge_column(parts):
+    col = np.concatenate(parts)
+    # Colonne entière relue en float64 parce qu'une autre colonne du bloc ne l'était pas
+    if col.dtype.kind == "f" and np.isfinite(col).all() and (col == np.trunc(col)).all():
+        col = col.astype(np.int64)
+    return col
+
+def _parse_columns(body, start, usecols):
+    # BytesIO partage l'objet bytes (pas de copie du fichier) ; on saute jusqu'à la première ligne
+    stream = io.BytesIO(body)
+    stream.seek(start)
+    # Fast path : tout est entier (timestamp + ADC)
+    try:
+        matrix = _loadtxt(stream, usecols, np.int64)
+        return [matrix[:, c] for c in range(matrix.shape[1])], []
+    except ValueError:
+        pass
+
+    # Slow path : par blocs de FALLBACK_LINES lignes, en reprenant au début (le fast path a déjà
+    # consommé le flux jusqu'à la cellule fautive). Renvoie aussi les indices des lignes écartées.
+    stream.seek(start)
+    parts = []
+    bad = []
+    line = 0
+    while True:
+        lines = list(itertools.islice(stream, FALLBACK_LINES))
+        if not lines:
+            break
+        matrix, blockBad = _parse_block(lines, usecols)
+        parts.append(matrix)
+        bad.extend(i + line for i in blockBad)
+        line += len(lines)
+    return [_merge_column([p[:, c] for p in parts]) for c in range(len(usecols))], bad
+
+def parse_header(line, remove_last_col=False):
+    """Return the column names of a CSV header line and the number of commas each row must have.
+
+    The last column is left out if remove_last_col is set or if it has no name (trailing comma).
+    """
+    header = line.decode().rstrip("\r\n").split(",")
+    nbCommas = len(header) - 1
+    # Colonne sans nom : toujours vide, elle ferait écarter toutes les lignes comme non numériques
+    if remove_last_col or (nbCommas and header[-1].strip() == ""):
+        header = header[0:-1]
+    return [h.strip() for h in header], nbCommas
+
+SCAN_BYTES = 16 * 1024 * 1024  # taille des blocs du comptage des virgules
+
+def _scan_lines(buf):
+    # Position des '\n' et nombre de virgules par ligne, bloc par bloc : seuls des masques de
+    # SCAN_BYTES octets et un entier par ligne sont alloués, jamais un tableau par octet du fichier
+    newlines = []
+    commas = []  # virgules cumulées depuis le début de buf, lues à chaque '\n'
+    total = 0
+    for offset in range(0, len(buf), SCAN_BYTES):
+        block = buf[offset:offset + SCAN_BYTES]
+        ends = np.flatnonzero(block == ord("\n"))
+        commaPos = np.flatnonzero(block == ord(","))
+        newlines.append(ends + offset)
+        commas.append(np.searchsorted(commaPos, ends) + total)
+        total += len(commaPos)
+    if not newlines:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(newlines), np.diff(np.concatenate(commas), prepend=0)
+
+def _valid_body(body, start, newlines, valid):
+    # Recopie les lignes valides par plages consécutives (une plage par ligne écartée, pas par octet)
+    view = memoryview(body)[start:]
+    lineStarts = np.concatenate(([0], newlines[:-1] + 1))
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], valid.view(np.int8), [0]))))
+    return b"".join(view[lineStarts[a]:newlines[b - 1] + 1] for a, b in zip(edges[::2], edges[1::2]))
+
+def parse_rows(body, header, nbCommas, firstLine=1, start=0):
+    """Parse the complete CSV rows of body[start:] (bytes ending with a newline) into typed columns, dropping malformed rows."""
+    buf = np.frombuffer(body, dtype=np.uint8)[start:]
+    newlines, commasPerLine = _scan_lines(buf)
+    lineLengths = np.diff(newlines, prepend=-1)
+    # Lignes vides : loadtxt les sauterait sans le dire, on les compte comme malformées
+    valid = (commasPerLine == nbCommas) & (lineLengths > 1)
+    nbValid = int(valid.sum())
+    validLines = None  # numéros (dans body) des lignes gardées, si certaines ont été écartées
+
+    if nbValid < len(valid):
+        ignored = np.flatnonzero(~valid) + firstLine
+        print(f"ERROR : {len(ignored)} LINES IGNORED (first: {ignored[:10].tolist()})")
+        if nbValid:
+            validLines = np.flatnonzero(valid)
+            body, start = _valid_body(body, start, newlines, valid), 0
+
+    del newlines, commasPerLine, lineLengths, valid  # un entier par ligne, inutiles pendant loadtxt
+
+    data = {}
+    if nbValid == 0:
+        for h in header:
+            data[h] = np.empty(0, dtype=np.int64)
+        return data
+
+    columns, bad = _parse_columns(body, start, range(len(header)))
+    if bad:
+        lines = (validLines[bad] if validLines is not None else np.asarray(bad)) + firstLine
+        print(f"ERROR : {len(bad)} LINES WITH NON NUMERIC VALUES IGNORED (first: {lines[:10].tolist()})")
+    # Garde-fou : aucune ligne valide ne doit disparaître entre le comptage et le parsing
+    if len(columns[0]) != nbValid - len(bad):
+        raise ValueError(f"parsed {len(columns[0])} rows out of {nbValid - len(bad)} valid lines")
+    for h, col in zip(header, columns):
+        data[h] = col
+    return data
+
+@SiriusProfile.stage()
+def load_csv(path, remove_last_col=False):
+    """Load a CSV into a read-only SessionData of compact numpy columns keyed by header."""
+    with open(path, "rb") as din:
+        raw = din.read()
+
+    if not raw.endswith(b"\n"):
+        raw += b"\n"
+
+    headerEnd = raw.index(b"\n")
+    header, nbCommas = parse_header(raw[:headerEnd], remove_last_col)
+
+    print("CONVERTING DATA...")
+    data = parse_rows(raw, header, nbCommas, start=headerEnd + 1)
+    del raw  # le texte n'est plus utile pendant la copie compacte des colonnes
+    return SessionData(compact_columns(data))
+
+ADC_DTYPE = np.uint16  # ADC 12 bits : 2 octets par échantillon au lieu de 8
+
+def compact_columns(data):
+    """Narrow integer columns: uint16 for ADC channels, contiguous int64 for the timestamp (first column)."""
+    compact = {}
+    for i, (name, col) in enumerate(data.items()):
+        col = np.asarray(col)
+        if i > 0 and np.issubdtype(col.dtype, np.integer) and col.size:
+            if col.min() >= 0 and col.max() <= np.iinfo(ADC_DTYPE).max:
+                col = col.astype(ADC_DTYPE)
+        # Copie contiguë : une vue sur la matrice de loadtxt la garderait en entier en mémoire
+        compact[name] = np.ascontiguousarray(col)
+    return compact
+
+class SessionData(Mapping):
+    """Read-only {name: column} of a loaded log.
+
+    data[name] always returns the same read-only array (no copy); use data.float(name) where
+    a float64 computation needs its own copy.
+    """
+
+    def __init__(self, columns):
+        self._columns = {}
+        for name, col in columns.items():
+            col = np.asarray(col).view()
+            col.flags.writeable = False
+            self._columns[name] = col
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return len(self._columns)
+
+    def float(self, name, start=None, stop=None):
+        """float64 copy of data[name][start:stop]."""
+        return self._columns[name][start:stop].astype(np.float64)
+
+    @property
+    def nbytes(self):
+        return sum(col.nbytes for col in self._columns.values())
+
+
+CACHE_DIR = os.environ.get("SIRIUS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sirius_cache"))
+CACHE_MAX_BYTES = int(os.environ.get("SIRIUS_CACHE_MAX_BYTES", 8 * 1024**3))
+HASH_BLOCK = 1024 * 1024
+CACHE_VERSION = 4  # 2 : colonnes ADC en uint16, 3 : sessions tronquées par le fallback texte, 4 : colonnes texte
+
+def _file_fingerprint(path):
+    # Hash du début, de la fin et de quelques blocs au milieu : assez pour détecter une réécriture sans lire 2 GB
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 8 * HASH_BLOCK:
+            h.update(f.read())
+        else:
+            for offset in np.linspace(0, size - HASH_BLOCK, 8, dtype=np.int64):
+                f.seek(int(offset))
+                h.update(f.read(HASH_BLOCK))
+    return h.hexdigest()
+
+def _cache_entry(path, remove_last_col):
+    key = hashlib.blake2b(f"{os.path.abspath(path)}|{remove_last_col}".encode(), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, key)
+
+def _read_cache(entry, path, remove_last_col):
+    manifestPath = os.path.join(entry, "manifest.json")
+    try:
+        with open(manifestPath, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    stat = os.stat(path)
+    if (manifest.get("version") != CACHE_VERSION or manifest["source"] != os.path.abspath(path) or manifest["remove_last_col"] != remove_last_col
+            or manifest["size"] != stat.st_size or manifest["mtime"] != stat.st_mtime_ns
+            or manifest["hash"] != _file_fingerprint(path)):
+        return None
+
+    data = {}
+    for col in manifest["columns"]:
+        # mmap_mode "r" : les colonnes sont lues depuis le cache sans copie, et en lecture seule
+        data[col["name"]] = np.load(os.path.join(entry, col["file"]), mmap_mode="r")
+    os.utime(manifestPath)
+    return SessionData(data)
+
+def _write_cache(entry, path, remove_last_col, data):
+    stat = os.stat(path)
+    tmp = entry + f".tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = []
+    for i, (name, col) in enumerate(data.items()):
+        filename = f"col_{i}.npy"
+        np.save(os.path.join(tmp, filename), col)
+        columns.append({"name": name, "file": filename, "dtype": col.dtype.str})
+
+    manifest = {
+        "version": CACHE_VERSION,
+        "source": os.path.abspath(path),
+        "remove_last_col": remove_last_col,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "hash": _file_fingerprint(path),
+        "columns": columns,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    shutil.rmtree(entry, ignore_errors=True)
+    os.replace(tmp, entry)
+
+def evict_cache(max_bytes=None):
+    """Remove least recently used cache entries until the cache fits in max_bytes."""
+    if max_bytes is None:
+        max_bytes = CACHE_MAX_BYTES
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        entry = os.path.join(CACHE_DIR, name)
+        manifestPath = os.path.join(entry, "manifest.json")
+        if not os.path.isfile(manifestPath):
+            continue
+        size = sum(f.stat().st_size for f in os.scandir(entry))
+        entries.append((os.path.getmtime(manifestPath), size, entry))
+
+    total = sum(e[1] for e in entries)
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= size
+
+@SiriusProfile.stage()
+def load_csv_cached(path, remove_last_col=False):
+    """Load a CSV through the binary column cache, parsing it only if the cache is stale."""
+    entry = _cache_entry(path, remove_last_col)
+    data = _read_cache(entry, path, remove_last_col)
+    if data is not None:
+        print("LOADED FROM CACHE")
+        return data
+
+    data = load_csv(path, remove_last_col)
+    try:
+        _write_cache(entry, path, remove_last_col, data)
+        evict_cache()
+    except OSError as e:
+        print("CACHE NOT WRITTEN:", e)
+    return data
+
+
+def _channel_worker(task):
+    stages, inName, outName, shape, inDtype, row = task
+    shmIn = shared_memory.SharedMemory(name=inName)
+    shmOut = shared_memory.SharedMemory(name=outName)
+    try:
+        channels = np.ndarray(shape, dtype=inDtype, buffer=shmIn.buf)
+        out = np.ndarray(shape, dtype=np.float64, buffer=shmOut.buf)
+        y = channels[row]
+        for stage in stages:
+            y = stage(y)
+        out[row] = y
+        del channels, out, y
+    finally:
+        shmIn.close()
+        shmOut.close()
+
+class ChannelExecutor:
+    """Run per-channel stages on a shared-memory channel matrix with a persistent process pool."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or int(os.environ.get("SIRIUS_WORKERS", 0)) or os.cpu_count()
+        self._pool = None
+        self._blocks = []
+        self._orphans = []
+
+    def _get_pool(self):
+        if self._pool is None:
+            # Pas de fork : le REPL a déjà des threads (writer SiriusExport, queue de SiriusPlot) et un
+            # fork pendant qu'un d'eux tient un verrou (stdout...) bloquerait le worker pour toujours
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._pool = multiprocessing.get_context(method).Pool(self.workers)
+        return self._pool
+
+    def _free_unused_blocks(self):
+        alive = []
+        for shm, ref in self._blocks:
+            if ref() is None:
+                shm.close()
+                shm.unlink()
+            else:
+                alive.append((shm, ref))
+        self._blocks = alive
+
+    @SiriusProfile.stage()
+    def map(self, channels, *stages):
+        """Apply stages in order to every channel, returns a (n_channels, n_samples) float64 matrix.
+
+        Each row of the result is a view on shared memory, no copy is made back to this process.
+        """
+        self._free_unused_blocks()
+        channels = [np.asarray(c) for c in channels]
+        shape = (len(channels), len(channels[0]))
+        inDtype = np.result_type(*channels)
+
+        if self.workers <= 1 or shape[0] <= 1:
+            out = np.empty(shape, dtype=np.float64)
+            for row, y in enumerate(channels):
+                for stage in stages:
+                    y = stage(y)
+                out[row] = y
+            return out
+
+        itemsize = np.dtype(inDtype).itemsize
+        shmIn = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * itemsize))
+        shmOut = shared_memory.SharedMemory(create=True, size=max(1, shape[0] * shape[1] * 8))
+        try:
+            matrix = np.ndarray(shape, dtype=inDtype, buffer=shmIn.buf)
+            for row, c in enumerate(channels):
+                matrix[row] = c
+            del matrix
+
+            tasks = [(stages, shmIn.name, shmOut.name, shape, inDtype, row) for row in range(shape[0])]
+            self._get_pool().map(_channel_worker, tasks)
+        except BaseException:
+            shmOut.close()
+            shmOut.unlink()
+            raise
+        finally:
+            shmIn.close()
+            shmIn.unlink()
+
+        out = np.ndarray(shape, dtype=np.float64, buffer=shmOut.buf)
+        # Le bloc est libéré au prochain appel une fois que plus personne ne référence le résultat
+        self._blocks.append((shmOut, weakref.ref(out)))
+        return out
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        self._free_unused_blocks()
+        # Les résultats encore référencés restent valides jusqu'à la fin du process
+        for shm, _ in self._blocks:
+            shm.unlink()
+            self._orphans.append(shm)
+        self._blocks = []
+
+
+_EXECUTOR = None
+
+def get_executor(workers=None):
+    """Return the session-wide ChannelExecutor, recreating it if the worker count changes."""
+    global _EXECUTOR
+    if _EXECUTOR is not None and workers is not None and workers != _EXECUTOR.workers:
+        _EXECUTOR.close()
+        _EXECUTOR = None
+    if _EXECUTOR is None:
+        _EXECUTOR = ChannelExecutor(workers)
+        atexit.register(_EXECUTOR.close)
+    return _EXECUTOR
+
+
+def _owned(value):
+    # Une ligne d'une matrice (bloc partagé de l'executor, calibrate_matrix...) garde toute la matrice
+    # en vie : on la copie pour que le cache compte et libère vraiment ce qu'il garde
+    base = value
+    while isinstance(base.base, np.ndarray):
+        base = base.base
+    if base is not value and base.nbytes > value.nbytes:
+        return value.copy()
+    return value
+
+class DerivationCache:
+    """LRU cache of derived channels, bounded in bytes and invalidated when the source column changes."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, source):
+        entry = self._entries.get(key)
+        if entry is None or entry[0]() is not source:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, source, value):
+        if key in self._entries:
+            self.nbytes -= self._entries.pop(key)[1].nbytes
+        if value.nbytes > self.max_bytes:
+            return value
+        value = _owned(value)
+        value.flags.writeable = False
+        self._drop_dead_sources()
+        # Référence faible : le cache ne doit pas garder en vie les colonnes d'un log déjà fermé
+        # (SiriusBatch enchaîne plusieurs logs dans le même worker), elles ne sont pas comptées
+        self._entries[key] = (weakref.ref(source), value)
+        self.nbytes += value.nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, old) = self._entries.popitem(last=False)
+            self.nbytes -= old.nbytes
+        return value
+
+    def _drop_dead_sources(self):
+        for key, (ref, value) in list(self._entries.items()):
+            if ref() is None:
+                del self._entries[key]
+                self.nbytes -= value.nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.nbytes,
+            "max_bytes": self.max_bytes,
+        }
+
+DERIVATION_CACHE = DerivationCache(int(os.environ.get("SIRIUS_DERIVATION_CACHE_BYTES", 2 * 1024**3)))
+
+
+def _stage_key(stage):
+    if isinstance(stage, functools.partial):
+        return (stage.func.__qualname__, stage.args, tuple(sorted(stage.keywords.items())))
+    if hasattr(stage, "cache_key"):  # objets appelables (calibrations)
+        return stage.cache_key
+    return stage.__qualname__
+
+def column_name(data, y):
+    """Return the header of the column y in data, or None if y is not a loaded column."""
+    for name, col in data.items():
+        if col is y:
+            return name
+    return None
+
+@SiriusProfile.stage()
+def y_filtered_cached(data, name, start=None, stop=None, window_length=1000, polyorder=3):
+    """Savgol-filter data[name][start:stop], reusing a previous result with the same parameters."""
+    source = data[name]
+    stage = y_filtered
+    if (window_length, polyorder) != (1000, 3):
+        stage = functools.partial(y_filtered, window_length=window_length, polyorder=polyorder)
+    # Même clé que derive_channels(data, [name], y_filtered) pour partager les résultats
+    key = (name, start, stop, _stage_key(stage))
+    result = DERIVATION_CACHE.get(key, source)
+    if result is None:
+        result = DERIVATION_CACHE.put(key, source, stage(source[start:stop]))
+    return result
+
+def y_filtered_column(data, y, start=None, stop=None):
+    """Filter y[start:stop] through the cache when y is one of the loaded columns."""
+    name = column_name(data, y)
+    if name is None:
+        return y_filtered(y[start:stop])
+    return y_filtered_cached(data, name, start, stop)
+
+@SiriusProfile.stage()
+def derive_channels(data, names, *stages):
+    """Apply stages to every named column through the executor, computing only uncached channels."""
+    stagesKey = tuple(_stage_key(stage) for stage in stages)
+    results = {}
+    missing = []
+    for name in names:
+        cached = DERIVATION_CACHE.get((name, None, None) + stagesKey, data[name])
+        if cached is None:
+            missing.append(name)
+        else:
+            results[name] = cached
+
+    if missing:
+        executor = get_executor()
+        computed = executor.map([data[name] for name in missing], *stages)
+        for name, row in zip(missing, computed):
+            results[name] = DERIVATION_CACHE.put((name, None, None) + stagesKey, data[name], row)
+        # Les lignes ont été copiées par le cache : le bloc partagé peut partir tout de suite
+        del computed, row
+        executor._free_unused_blocks()
+
+    return [results[name] for name in names]
+
+
+SPECTRUM_NPERSEG = 1024
+SPECTRUM_OVERLAP = 0.5
+SPECTRUM_PEAK_MIN_HZ = 20  # en dessous c'est l'enveloppe du burn, pas une instabilité
+SPECTRUM_CHUNK = 32  # segments par FFT groupée (par canal) : les blocs restent dans le cache CPU
+
+@functools.lru_cache(maxsize=8)
+def spectral_window(nperseg):
+    """Periodic Hann window of nperseg samples (same as scipy.signal.welch), built once per size."""
+    window = signal.get_window("hann", nperseg)
+    window.flags.writeable = False
+    return window
+
+def sample_rate(x):
+    """Sampling frequency in Hz from the median timestamp step."""
+    return TIMESTAMP_SCALE / float(np.median(np.diff(np.asarray(x[:100_000], dtype=np.float64))))
+
+@SiriusProfile.stage()
+def spectrogram_matrix(matrix, fs, nperseg=SPECTRUM_NPERSEG, overlap=SPECTRUM_OVERLAP):
+    """PSD of every row of a (n_channels, n_samples) matrix over overlapping Hann segments.
+
+    Returns (freqs, segment centers in samples, psd (n_channels, n_segments, n_freqs) float32),
+    matching scipy.signal.spectrogram(window="hann", detrend="constant", scaling="density").
+    """
+    matrix = np.atleast_2d(np.asarray(matrix))
+    nperseg = min(nperseg, matrix.shape[1])
+    step = nperseg - int(nperseg * overlap)
+    # Vue (canaux, segments, nperseg) sans copie, les segments se chevauchent en mémoire
+    segments = np.lib.stride_tricks.sliding_window_view(matrix, nperseg, axis=-1)[:, ::step]
+    window = spectral_window(nperseg)
+    scale = 1.0 / (fs * (window * window).sum())
+    nbSegments = segments.shape[1]
+    nbFreqs = nperseg // 2 + 1
+    last = -1 if nperseg % 2 == 0 else None  # Nyquist n'est pas doublé
+
+    psd = np.empty((matrix.shape[0], nbSegments, nbFreqs), dtype=np.float32)
+    for s0 in range(0, nbSegments, SPECTRUM_CHUNK):
+        block = segments[:, s0:s0 + SPECTRUM_CHUNK].astype(np.float64)
+        block -= block.mean(axis=-1, keepdims=True)
+        block *= window
+        spectrum = fft.rfft(block, axis=-1, workers=-1)  # scipy.fft garde les plans de nperseg en cache
+        power = spectrum.real ** 2 + spectrum.imag ** 2
+        power *= scale
+        power[..., 1:last] *= 2
+        psd[:, s0:s0 + SPECTRUM_CHUNK] = power
+
+    freqs = np.fft.rfftfreq(nperseg, 1 / fs)
+    centers = np.arange(nbSegments) * step + nperseg / 2
+    return freqs, centers, psd
+
+def channel_spectrograms(data, names, start=None, stop=None, nperseg=SPECTRUM_NPERSEG, overlap=SPECTRUM_OVERLAP):
+    """Spectrograms of the named columns over [start, stop), computing only the uncached channels in one batch.
+
+    Returns (freqs, segment center timestamps, [psd per name]).
+    """
+    x = next(iter(data.values()))[start:stop]
+    fs = sample_rate(x)
+    stageKey = ("spectrogram", nperseg, overlap)
+    results = {}
+    missing = []
+    for name in names:
+        cached = DERIVATION_CACHE.get((name, start, stop, stageKey), data[name])
+        if cached is None:
+            missing.append(name)
+        else:
+            results[name] = cached
+
+    if missing:
+        # NaN d'un log fusionné : remplacés par la moyenne du canal pour ne pas contaminer tout le segment
+        matrix = np.vstack([data[name][start:stop] for name in missing])
+        if matrix.dtype.kind == "f" and np.isnan(matrix).any():
+            matrix = np.where(np.isnan(matrix), np.nanmean(matrix, axis=1, keepdims=True), matrix)
+        _, _, psd = spectrogram_matrix(matrix, fs, nperseg, overlap)
+        for name, channelPsd in zip(missing, psd):
+            results[name] = DERIVATION_CACHE.put((name, start, stop, stageKey), data[name], channelPsd)
+
+    nperseg = min(nperseg, len(x))
+    step = nperseg - int(nperseg * overlap)
+    centers = np.arange(results[names[0]].shape[0]) * step + nperseg // 2
+    return np.fft.rfftfreq(nperseg, 1 / fs), x[centers], [results[name] for name in names]
+
+def welch(psd):
+    """Welch PSD (mean over segments) of a channel spectrogram."""
+    return psd.mean(axis=0, dtype=np.float64)
+
+def spectral_peak(freqs, power, min_hz=SPECTRUM_PEAK_MIN_HZ):
+    """Index of the strongest frequency at or above min_hz."""
+    first = int(np.searchsorted(freqs, min_hz))
+    return first + int(np.argmax(power[first:]))
+
+
+class Burn(NamedTuple):
+    start: int          # index of the first sample of the burn
+    stop: int           # index after the last sample of the burn
+    ignition: float     # x (timestamp) at ignition
+    burn_time: float    # seconds, x being in us
+
+BURN_ON_FRACTION = 0.5
+BURN_OFF_FRACTION = 0.25
+BURN_MIN_DURATION = 500_000  # us, plus court = bruit
+
+def hysteresis(y, on, off):
+    """Schmitt trigger along the last axis: True from a sample above on until the next sample below off.
+
+    y can be 2-D (channels x samples) with on/off given per channel.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    on = np.asarray(on, dtype=np.float64)
+    off = np.asarray(off, dtype=np.float64)
+    if y.ndim == 2:
+        on = on.reshape(-1, 1) if on.ndim else on
+        off = off.reshape(-1, 1) if off.ndim else off
+
+    above = y > on
+    below = y < off
+    # Index du dernier échantillon qui a fixé l'état (au-dessus de on ou sous off), propagé vers l'avant
+    last = np.where(above | below, np.arange(y.shape[-1]), -1)
+    last = np.maximum.accumulate(last, axis=-1)
+    return np.take_along_axis(above, np.maximum(last, 0), axis=-1) & (last >= 0)
+
+def _burns(x, state, min_duration):
+    edges = np.diff(state.astype(np.int8), prepend=0, append=0)
+    starts = np.flatnonzero(edges == 1)
+    stops = np.flatnonzero(edges == -1)
+    durations = x[stops - 1] - x[starts]
+    keep = durations >= min_duration
+    return [Burn(int(a), int(b), float(x[a]), float(x[b - 1] - x[a]) / 1e6) for a, b in zip(starts[keep], stops[keep])]
+
+@SiriusProfile.stage()
+def detect_burns(x, y, on, off, min_duration=0):
+    """Return the Burn windows of y lasting at least min_duration (x units), one list per channel if y is 2-D."""
+    x = np.asarray(x)
+    state = hysteresis(y, on, off)
+    if state.ndim == 1:
+        return _burns(x, state, min_duration)
+    return [_burns(x, s, min_duration) for s in state]
+
+def burn_thresholds(y):
+    """On/off thresholds relative to each channel's baseline (median) and peak."""
+    y = np.asarray(y, dtype=np.float64)
+    baseline = np.nanmedian(y, axis=-1)
+    span = np.nanmax(y, axis=-1) - baseline
+    return baseline + BURN_ON_FRACTION * span, baseline + BURN_OFF_FRACTION * span
+
+@SiriusProfile.stage()
+def burn_window(x, y, data, pad=0.1):
+    """Index range (start, stop) around the longest burn of the filtered y, widened by pad * its length."""
+    yFiltered = y_filtered_column(data, y)
+    on, off = burn_thresholds(yFiltered)
+    burns = detect_burns(x, yFiltered, on, off, BURN_MIN_DURATION)
+    if not burns:
+        return None
+    burn = max(burns, key=lambda b: b.stop - b.start)
+    margin = int((burn.stop - burn.start) * pad)
+    return max(0, burn.start - margin), min(len(y), burn.stop + margin)
+
+
+TIMESTAMP_SCALE = 1e6  # timestamps en us
+
+class TimeIndex:
+    """Sorted timeline of the timestamp column for O(log n) nearest-time and time-range lookups.
+
+    Counter wrap-arounds (big backward jumps) are unwrapped; if the timeline still goes
+    backwards it is argsorted and range lookups return index arrays instead of slices.
+    """
+
+    def __init__(self, x):
+        x = np.asarray(x)
+        self.t = x.astype(np.int64) if np.issubdtype(x.dtype, np.integer) else x.astype(np.float64)
+        self.order = None
+        self.wraps = 0
+        if len(x) < 2:
+            return
+
+        steps = np.diff(self.t)
+        if np.all(steps >= 0):
+            return
+
+        # Compteur qui repart à 0 : période = puissance de 2 au-dessus du max
+        period = 2 ** int(np.ceil(np.log2(float(self.t.max()) + 1)))
+        wrapped = steps < -period / 2
+        self.wraps = int(wrapped.sum())
+        if self.wraps:
+            self.t = self.t + period * np.concatenate(([0], np.cumsum(wrapped)))
+        if not np.all(np.diff(self.t) >= 0):
+            print("WARNING : TIMESTAMPS NOT MONOTONIC, TIME LOOKUPS USE A SORTED COPY")
+            self.order = np.argsort(self.t, kind="stable")
+            self.t = self.t[self.order]
+
+    def _index(self, i):
+        return int(i if self.order is None else self.order[i])
+
+    def from_seconds(self, seconds):
+        """Timestamp seconds after the first sample."""
+        return self.t[0] + seconds * TIMESTAMP_SCALE
+
+    def nearest(self, value):
+        """Index of the sample whose timestamp is closest to value."""
+        i = int(np.searchsorted(self.t, value))
+        if i == len(self.t) or (i > 0 and value - self.t[i - 1] <= self.t[i] - value):
+            i -= 1
+        return self._index(i)
+
+    def lookup(self, values, how="nearest", tolerance=None):
+        """Vectorized nearest (or as-of: last at or before) sample of every value.
+
+        Returns (indices, matched) where matched is False when no sample lies within tolerance, or
+        when the value is outside the recorded span [t[0], t[-1]] widened by tolerance.
+        """
+        values = np.asarray(values)
+        n = len(self.t)
+        right = np.searchsorted(self.t, values, side="right")
+        lo = np.clip(right - 1, 0, n - 1)
+        if how == "asof":
+            i = lo
+            matched = right > 0
+        else:
+            hi = np.minimum(right, n - 1)
+            i = np.where(np.abs(self.t[hi] - values) < np.abs(values - self.t[lo]), hi, lo)
+            matched = np.ones(len(values), dtype=bool)
+        # Hors de la période enregistrée, répéter le premier/dernier échantillon inventerait des données
+        margin = 0 if tolerance is None else tolerance
+        matched &= (values >= self.t[0] - margin) & (values <= self.t[-1] + margin)
+        if tolerance is not None:
+            matched &= np.abs(values - self.t[i]) <= tolerance
+        if self.order is not None:
+            i = self.order[i]
+        return i, matched
+
+    def range(self, start=None, stop=None):
+        """Samples with start <= t < stop, as a slice (zero-copy) or an index array if the data was unsorted."""
+        i0 = 0 if start is None else int(np.searchsorted(self.t, start, side="left"))
+        i1 = len(self.t) if stop is None else int(np.searchsorted(self.t, stop, side="left"))
+        if self.order is None:
+            return slice(i0, i1)
+        return np.sort(self.order[i0:i1])
+
+    def window(self, data, start=None, stop=None):
+        """Every column of data restricted to start <= t < stop."""
+        sel = self.range(start, stop)
+        return {name: col[sel] for name, col in data.items()}
+
+_TIME_INDEXES = {}
+
+def time_index(data):
+    """TimeIndex of the first column of data, built once per loaded session."""
+    x = next(iter(data.values()))
+    cached = _TIME_INDEXES.get(id(x))
+    if cached is None or cached[0] is not x:
+        cached = (x, TimeIndex(x))
+        _TIME_INDEXES.clear()
+        _TIME_INDEXES[id(x)] = cached
+    return cached[1]
+
+def _align_column(col, index, timeline, how, tolerance):
+    if how == "linear":
+        t = index.t
+        sortedCol = col if index.order is None else col[index.order]
+        out = np.interp(timeline, t, sortedCol.astype(np.float64), left=np.nan, right=np.nan)
+        if tolerance is not None:
+            _, matched = index.lookup(timeline, "nearest", tolerance)
+            out[~matched] = np.nan
+        return out
+
+    indices, matched = index.lookup(timeline, how, tolerance)
+    out = col[indices]
+    if not matched.all():
+        out = out.astype(np.float64)
+        out[~matched] = np.nan
+    return out
+
+@SiriusProfile.stage()
+def merge_sessions(sessions, how="nearest", tolerance=None, rate=None):
+    """Align several loaded logs {label: data} on one timeline, the first column of each being its timestamps.
+
+    The timeline is the sorted union of every timestamp, or with rate (Hz) a uniform grid over the
+    span covered by all logs. how is "nearest", "asof" (last sample at or before) or "linear".
+    Columns of the first log keep their name, the others become "label.name". Samples outside a
+    log's recorded span or with no match within tolerance (timestamp units) are NaN.
+    """
+    labels = list(sessions)
+    indexes = {label: TimeIndex(next(iter(sessions[label].values()))) for label in labels}
+
+    if rate:
+        start = max(index.t[0] for index in indexes.values())
+        stop = min(index.t[-1] for index in indexes.values())
+        step = TIMESTAMP_SCALE / rate
+        timeline = start + np.arange(int((stop - start) // step) + 1) * step
+        if all(np.issubdtype(index.t.dtype, np.integer) for index in indexes.values()) and step == int(step):
+            timeline = timeline.astype(np.int64)
+    else:
+        # Chaque timeline est déjà triée : le tri stable (timsort) fusionne les séquences en temps linéaire
+        timeline = np.sort(np.concatenate([index.t for index in indexes.values()]), kind="stable")
+        if len(timeline):
+            timeline = timeline[np.concatenate(([True], timeline[1:] != timeline[:-1]))]
 
-    with open(filename, "w") as f:
-        f.write(json.dumps(data))
-    
-    print("FILE COMPLETED")
\ No newline at end of file
+    first = next(iter(sessions[labels[0]]))
+    merged = {first: timeline}
+    for n, label in enumerate(labels):
+        data = sessions[label]
+        names = list(data)[1:]
+        for name in names:
+            key = name if n == 0 else f"{label}.{name}"
+            merged[key] = _align_column(np.asarray(data[name]), indexes[label], timeline, how, tolerance)
+    return SessionData(merged)